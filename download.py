@@ -1,28 +1,47 @@
+import argparse
 import asyncio
-from src.assets_generator.get_assets import Assets, AssetType
+import os
+from src.assets_generator.get_assets import Assets
+from src.assets_generator.sync_assets import AssetSync
+from src.draw.output_cache import remove_legacy_outputs
 from src.utils.app_config import config
+from src.utils.http_client import HttpClient
 
 
-async def download_asset(Assets_instance, asset_type, asset_number, semaphore):
-    async with semaphore:
-        await Assets_instance.get(asset_type, asset_number)
+async def main(args):
+    if args.remove_legacy_outputs:
+        remove_legacy_outputs(
+            os.path.join(config.static_config["assets_path"], "images")
+        )
+        return
 
+    assets_instance = Assets.get_instance(
+        config.base_url, config.static_config["assets_path"]
+    )
 
-async def main():
-    base_url = config.base_url
-    assets_folder = config.static_config["assets_path"]
-
-    Assets_instance = Assets(base_url=base_url, assets_folder=assets_folder)
-
-    semaphore = asyncio.Semaphore(100)  # Limiting concurrent downloads to 10
-
-    tasks = []
-    for i in range(1, 20001):
-        task = download_asset(Assets_instance, AssetType.COVER, i, semaphore)
-        tasks.append(task)
-
-    await asyncio.gather(*tasks)
+    asset_sync = AssetSync(
+        assets_instance,
+        config.cache_config.get("cache_path", "./static/cache"),
+        concurrency=args.concurrency,
+        retries=args.retries,
+    )
+    try:
+        await asset_sync.run(verify_hash=args.verify, revalidate=args.revalidate)
+    finally:
+        await HttpClient.get_instance().close()
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    parser = argparse.ArgumentParser(description="增量同步 maimai 资产")
+    parser.add_argument("--concurrency", type=int, default=16, help="最大并发下载数")
+    parser.add_argument("--retries", type=int, default=3, help="单个资产的最大重试次数")
+    parser.add_argument("--verify", action="store_true", help="校验本地文件的 sha256")
+    parser.add_argument(
+        "--revalidate", action="store_true", help="对已有资产发起条件请求检查远程变更"
+    )
+    parser.add_argument(
+        "--remove-legacy-outputs",
+        action="store_true",
+        help="只删除旧版本写入素材目录的 b50 原图(*_origin.png)，不同步资产",
+    )
+    asyncio.run(main(parser.parse_args()))
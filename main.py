@@ -5,8 +5,11 @@ import botpy
 from botpy.logging import DEFAULT_FILE_HANDLER
 
 from src.bot.client import MyClient
+from src.assets_generator.get_assets import Assets
 from src.utils.app_config import config
 from src.database.database_manager import create_tables
+from src.draw.render_pool import RenderPool
+from src.utils.http_client import HttpClient
 
 async def initialize_database():
     if not os.path.exists("local_db.sqlite"):
@@ -31,7 +34,13 @@ async def main():
     )
 
     # 直接调用 start 方法而不是 run
-    await client.start(appid=config.bot_config["appid"], secret=config.bot_config["secret"])
+    try:
+        await client.start(appid=config.bot_config["appid"], secret=config.bot_config["secret"])
+    finally:
+        # 关闭共享的 HTTP 连接池
+        await HttpClient.get_instance().close()
+        Assets.get_instance().save_missing()
+        RenderPool.get_instance().shutdown()
 
 if __name__ == "__main__":
     # 如果你的环境已经在运行一个事件循环（例如 Jupyter Notebook），不要使用 asyncio.run()
@@ -1,8 +1,23 @@
+import asyncio
+import json
+import os
+import random
+import tempfile
+import time
 from pathlib import Path
 from enum import Enum
 
 import aiohttp
 from botpy import logger
+from PIL import Image
+
+from src.utils.http_client import HttpClient
+
+# mkstemp 创建的临时文件权限为 0600，替换前改为按 umask 新建文件时的权限，
+# 否则其他用户(如提供静态文件的 Web 服务)无法读取下载的素材
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+FILE_MODE = 0o666 & ~_UMASK
 
 
 class AssetType(Enum):
@@ -31,9 +46,16 @@ class Assets:
 
     _instance = None
 
+    # 缺失资产记录的最短落盘间隔(秒)
+    MISSING_SAVE_INTERVAL = 5
+
     @classmethod
     def get_instance(
-        cls, base_url: str = None, assets_folder: str = None, proxy: str = None
+        cls,
+        base_url: str = None,
+        assets_folder: str = None,
+        proxy: str = None,
+        missing_ttl: float = 7 * 24 * 3600,
     ):
         """
         获取单例实例
@@ -41,10 +63,16 @@ class Assets:
         if cls._instance is None:
             if base_url is None or assets_folder is None:
                 raise ValueError("需要base_url和assets_folder来初始化")
-            cls._instance = cls(base_url, assets_folder, proxy)
+            cls._instance = cls(base_url, assets_folder, proxy, missing_ttl)
         return cls._instance
 
-    def __init__(self, base_url: str, assets_folder: str, proxy: str = None) -> None:
+    def __init__(
+        self,
+        base_url: str,
+        assets_folder: str,
+        proxy: str = None,
+        missing_ttl: float = 7 * 24 * 3600,
+    ) -> None:
         """
         初始化
         """
@@ -53,23 +81,237 @@ class Assets:
         self.base_url = base_url
         self.assets_folder = assets_folder
         self.proxy = proxy
+        # 正在下载中的资产，同一资产的并发请求会等待同一个下载任务
+        self._inflight = {}
+        # 远程确认不存在的资产 {"cover/123": 过期时间戳}，过期前不再请求
+        self.missing_ttl = missing_ttl
+        self._missing_file = Path(assets_folder, "missing.json")
+        self._missing = self._load_missing()
+        self._missing_dirty = False
+        self._missing_saved_at = 0.0
+        self._placeholders = {}
+        # 本地已有资产的内存索引 {AssetType: {资产ID: None}}，代替每次调用时的 stat
+        self._index = None
         Assets._instance = self
 
-    async def get(self, asset_type: AssetType, param_value) -> str:
+    def load_index(self):
         """
-        获取资产
+        扫描资产目录，建立本地资产索引
         """
-        local_file_path = Path(
-            self.assets_folder, asset_type.name.lower(), f"{param_value}.png"
+        index = {}
+        for asset_type in AssetType:
+            asset_ids = {}
+            folder = Path(self.assets_folder, asset_type.name.lower())
+            if folder.is_dir():
+                with os.scandir(folder) as entries:
+                    for entry in entries:
+                        if entry.name.endswith(".png") and entry.is_file():
+                            asset_ids[entry.name[: -len(".png")]] = None
+            index[asset_type] = asset_ids
+        self._index = index
+        logger.info(
+            "资产索引已加载：%d 个", sum(len(ids) for ids in index.values())
         )
+
+    def _get_index(self) -> dict:
+        if self._index is None:
+            self.load_index()
+        return self._index
+
+    def has(self, asset_type: AssetType, param_value) -> bool:
+        """
+        本地是否已有该资产
+        """
+        return str(param_value) in self._get_index()[asset_type]
+
+    def add_to_index(self, asset_type: AssetType, param_value):
+        """
+        将新下载的资产加入索引
+        """
+        self._get_index()[asset_type][str(param_value)] = None
+
+    def list_assets(self, asset_type: AssetType) -> list:
+        """
+        获取本地已有的某类资产 ID 列表
+        """
+        return list(self._get_index()[asset_type])
+
+    def count_assets(self, asset_type: AssetType) -> int:
+        """
+        本地已有的某类资产数量
+        """
+        return len(self._get_index()[asset_type])
+
+    def random_local_path(self, asset_type: AssetType, rng=random):
+        """
+        随机获取一个本地已有资产的路径，没有时返回 None
+
+        Args:
+            asset_type (AssetType): 资产类型。
+            rng (random.Random): 随机数生成器。
+        """
+        asset_ids = self._get_index()[asset_type]
+        if not asset_ids:
+            return None
+        # 排序后再选择，保证同一种子得到同一结果
+        return str(self.get_local_path(asset_type, rng.choice(sorted(asset_ids))))
+
+    async def get(self, asset_type: AssetType, param_value) -> str:
+        """
+        获取资产，资产不存在时返回该类型的占位图
+        """
+        if param_value is None or str(param_value) == "":
+            return self.get_placeholder(asset_type)
+        missing_key = f"{asset_type.name.lower()}/{param_value}"
+        if self.is_missing(missing_key):
+            return self.get_placeholder(asset_type)
+
+        local_file_path = self.get_local_path(asset_type, param_value)
+        if self.has(asset_type, param_value):
+            return str(local_file_path)
+
+        key = (asset_type, str(param_value))
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(
+                self._fetch(asset_type, param_value, local_file_path)
+            )
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # shield: 某个等待者被取消时不影响其他等待同一下载的请求
+        await asyncio.shield(task)
+        if not self.has(asset_type, param_value):
+            return self.get_placeholder(asset_type)
+        return str(local_file_path)
+
+    def get_local(self, asset_type: AssetType, param_value) -> str:
+        """
+        只从本地获取资产，不发起网络请求；本地没有时返回占位图。
+        绘图代码应先通过 prefetch 准备好资产，再使用此方法读取。
+        """
+        if param_value is None or str(param_value) == "":
+            return self.get_placeholder(asset_type)
+        local_file_path = self.get_local_path(asset_type, param_value)
+        if self.has(asset_type, param_value):
+            return str(local_file_path)
+        # 索引可能落后于其他进程的下载(如渲染进程)，未命中时再检查一次磁盘
         if local_file_path.exists():
+            self.add_to_index(asset_type, param_value)
             return str(local_file_path)
+        return self.get_placeholder(asset_type)
+
+    async def prefetch(self, items, concurrency: int = 16):
+        """
+        并发获取一组资产
+
+        Args:
+            items (iterable): (AssetType, 资产ID) 的集合。
+            concurrency (int): 最大并发数。
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def fetch(asset_type, param_value):
+            async with semaphore:
+                await self.get(asset_type, param_value)
+
+        await asyncio.gather(
+            *(
+                fetch(asset_type, param_value)
+                for asset_type, param_value in set(items)
+                if not self.has(asset_type, param_value)
+            )
+        )
+
+    async def _fetch(self, asset_type: AssetType, param_value, local_file_path):
         asset_url = f"{self.base_url}{asset_type.value}{param_value}"
         try:
-            await self.download_file(asset_url, local_file_path, self.proxy)
-        except aiohttp.ServerTimeoutError:
+            status = await self.download_file(asset_url, local_file_path, self.proxy)
+            if status == 200:
+                self.add_to_index(asset_type, param_value)
+            elif status == 404:
+                self.mark_missing(f"{asset_type.name.lower()}/{param_value}")
+        except (aiohttp.ServerTimeoutError, asyncio.TimeoutError):
             logger.warning("下载文件超时：%s", asset_url)
-        return str(local_file_path)
+        except aiohttp.ClientError as e:
+            logger.warning("下载文件失败：%s %s", asset_url, e)
+
+    def get_local_path(self, asset_type: AssetType, param_value) -> Path:
+        """
+        获取资产的本地路径(不检查是否存在)
+        """
+        return Path(self.assets_folder, asset_type.name.lower(), f"{param_value}.png")
+
+    def _load_missing(self) -> dict:
+        try:
+            with open(self._missing_file, "r", encoding="utf-8") as file:
+                missing = json.load(file)
+        except (OSError, ValueError):
+            return {}
+        now = time.time()
+        return {key: expire for key, expire in missing.items() if expire > now}
+
+    def is_missing(self, key: str) -> bool:
+        """
+        资产是否已确认缺失且记录未过期
+
+        Args:
+            key (str): 形如 "cover/123" 的资产键。
+        """
+        expire = self._missing.get(key)
+        if expire is None:
+            return False
+        if expire <= time.time():
+            del self._missing[key]
+            self._missing_dirty = True
+            return False
+        return True
+
+    def mark_missing(self, key: str):
+        """
+        记录缺失的资产
+        """
+        self._missing[key] = time.time() + self.missing_ttl
+        self._missing_dirty = True
+        if time.time() - self._missing_saved_at >= self.MISSING_SAVE_INTERVAL:
+            self.save_missing()
+
+    def clear_missing(self, key: str):
+        """
+        清除缺失记录(资产已成功下载时调用)
+        """
+        if self._missing.pop(key, None) is not None:
+            self._missing_dirty = True
+
+    def save_missing(self):
+        """
+        将缺失记录写入磁盘
+        """
+        if not self._missing_dirty:
+            return
+        self._missing_file.parent.mkdir(parents=True, exist_ok=True)
+        temp_file = self._missing_file.with_name(f"{self._missing_file.name}.tmp")
+        with open(temp_file, "w", encoding="utf-8") as file:
+            json.dump(self._missing, file)
+        os.replace(temp_file, self._missing_file)
+        self._missing_dirty = False
+        self._missing_saved_at = time.time()
+
+    def get_placeholder(self, asset_type: AssetType) -> str:
+        """
+        获取资产类型对应的占位图，不存在时生成一张透明图片
+        """
+        if asset_type in self._placeholders:
+            return self._placeholders[asset_type]
+        placeholder_path = Path(
+            self.generate_assets_path(
+                "placeholder", f"{asset_type.name.lower()}.png"
+            )
+        )
+        if not placeholder_path.exists():
+            placeholder_path.parent.mkdir(parents=True, exist_ok=True)
+            Image.new("RGBA", (1, 1), (0, 0, 0, 0)).save(placeholder_path)
+        self._placeholders[asset_type] = str(placeholder_path)
+        return self._placeholders[asset_type]
 
     def generate_assets_path(self, *paths: str) -> str:
         """
@@ -81,17 +323,37 @@ class Assets:
     async def download_file(url: str, save_path: str, proxy=None):
         """
         从URL下载文件
+
+        Returns:
+            int: HTTP 状态码。
         """
         logger.info("下载文件：%s", url)
-        async with aiohttp.ClientSession(conn_timeout=60) as session:
-            async with session.get(url, proxy=proxy) as response:
-                if response.status != 200:
-                    logger.warning("下载文件失败：%s", url)
-                    return
-                save_folder = Path(save_path).parent
-                if not save_folder.exists():
-                    save_folder.mkdir(parents=True)
-                content = await response.read()
-                with open(save_path, "wb") as file:
-                    file.write(content)
-                logger.info("从 %s 下载并保存文件到 %s", url, save_path)
+        async with HttpClient.get_instance().get(url, proxy=proxy) as response:
+            if response.status != 200:
+                logger.warning("下载文件失败：%s", url)
+                return response.status
+            content = await response.read()
+            Assets.save_file(save_path, content)
+            logger.info("从 %s 下载并保存文件到 %s", url, save_path)
+            return response.status
+
+    @staticmethod
+    def save_file(save_path: str, content: bytes):
+        """
+        保存文件：先写入同目录的临时文件再原子替换，避免读到写了一半的图片
+        """
+        save_folder = Path(save_path).parent
+        if not save_folder.exists():
+            save_folder.mkdir(parents=True, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(
+            dir=save_folder, prefix=".download_", suffix=".tmp"
+        )
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(content)
+            os.chmod(temp_path, FILE_MODE)
+            os.replace(temp_path, save_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
@@ -0,0 +1,111 @@
+"""
+manifest.py - 本地资产清单，记录已下载资产的大小、哈希和 ETag。
+"""
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+
+class AssetManifest:
+    """
+    资产清单
+
+    以 "cover/123" 形式的资产键为索引，保存在资产目录下的 manifest.json 中。
+    """
+
+    def __init__(self, manifest_path: str) -> None:
+        """
+        初始化
+
+        Args:
+            manifest_path (str): 清单文件路径。
+        """
+        self.manifest_path = Path(manifest_path)
+        self.entries = {}
+        self._dirty = False
+
+    def load(self):
+        """
+        从磁盘加载清单，文件不存在或损坏时视为空清单
+        """
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as file:
+                self.entries = json.load(file)
+        except (OSError, ValueError):
+            self.entries = {}
+        self._dirty = False
+
+    def save(self):
+        """
+        保存清单(原子替换)
+        """
+        if not self._dirty:
+            return
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_file = self.manifest_path.with_name(f"{self.manifest_path.name}.tmp")
+        with open(temp_file, "w", encoding="utf-8") as file:
+            json.dump(self.entries, file, ensure_ascii=False)
+        os.replace(temp_file, self.manifest_path)
+        self._dirty = False
+
+    def get(self, key: str):
+        """
+        获取资产记录
+        """
+        return self.entries.get(key)
+
+    def update(self, key: str, content: bytes, etag: str = None):
+        """
+        记录新下载的资产
+
+        Args:
+            key (str): 资产键。
+            content (bytes): 文件内容。
+            etag (str): 服务端返回的 ETag。
+        """
+        self.entries[key] = {
+            "size": len(content),
+            "sha256": hashlib.sha256(content).hexdigest(),
+            "etag": etag,
+            "updated_at": time.time(),
+        }
+        self._dirty = True
+
+    def update_from_file(self, key: str, local_path: str):
+        """
+        根据已存在的本地文件补全记录(不含 ETag)
+        """
+        with open(local_path, "rb") as file:
+            self.update(key, file.read())
+
+    def remove(self, key: str):
+        """
+        删除资产记录
+        """
+        if self.entries.pop(key, None) is not None:
+            self._dirty = True
+
+    def is_valid(self, key: str, local_path: str, verify_hash: bool = False) -> bool:
+        """
+        检查本地文件是否与清单记录一致
+
+        Args:
+            key (str): 资产键。
+            local_path (str): 本地文件路径。
+            verify_hash (bool): 是否校验 sha256，默认只比较文件大小。
+        """
+        entry = self.entries.get(key)
+        if entry is None:
+            return False
+        try:
+            if os.path.getsize(local_path) != entry["size"]:
+                return False
+        except OSError:
+            return False
+        if verify_hash:
+            with open(local_path, "rb") as file:
+                return hashlib.sha256(file.read()).hexdigest() == entry["sha256"]
+        return True
@@ -0,0 +1,190 @@
+"""
+sync_assets.py - 基于清单的增量资产同步。
+"""
+
+import asyncio
+from pathlib import Path
+
+import aiohttp
+from botpy import logger
+
+from src.assets_generator.get_assets import Assets, AssetType
+from src.assets_generator.manifest import AssetManifest
+from src.common.song_catalog import SongCatalog, get_cover_id
+from src.utils.cached_resource import CachedJsonResource
+from src.utils.http_client import HttpClient
+
+PLATE_LIST_URL = "https://maimai.lxns.net/api/v0/maimai/plate/list"
+ICON_LIST_URL = "https://maimai.lxns.net/api/v0/maimai/icon/list"
+
+# 成绩评级图标
+RANK_IDS = [
+    "d", "c", "b", "bb", "bbb", "a", "aa", "aaa",
+    "s", "sp", "ss", "ssp", "sss", "sssp",
+]
+# FC / FS 徽章
+BADGE_IDS = ["fc", "fcp", "ap", "app", "sync", "fs", "fsp", "fsd", "fsdp"]
+
+
+class AssetSync:
+    """
+    资产同步器
+
+    根据曲目目录、姓名框和头像列表计算应有的资产集合，与本地清单比对后
+    只下载新增或本地已损坏的资产。清单会定期落盘，中断后再次运行即可继续。
+    """
+
+    # 每完成多少个下载保存一次清单
+    SAVE_EVERY = 50
+
+    def __init__(
+        self,
+        assets: Assets,
+        cache_path: str,
+        concurrency: int = 16,
+        retries: int = 3,
+    ) -> None:
+        """
+        初始化
+
+        Args:
+            assets (Assets): 资产实例。
+            cache_path (str): 列表缓存目录。
+            concurrency (int): 最大并发下载数。
+            retries (int): 单个资产的最大重试次数。
+        """
+        self.assets = assets
+        self.concurrency = concurrency
+        self.retries = retries
+        self.manifest = AssetManifest(Path(assets.assets_folder, "manifest.json"))
+        self.plate_list = CachedJsonResource(
+            PLATE_LIST_URL, Path(cache_path, "plate_list.json"), proxy=assets.proxy
+        )
+        self.icon_list = CachedJsonResource(
+            ICON_LIST_URL, Path(cache_path, "icon_list.json"), proxy=assets.proxy
+        )
+        self._done = 0
+        self._total = 0
+        self._failed = 0
+
+    async def collect_expected(self):
+        """
+        计算应有的资产集合
+
+        Returns:
+            set: (AssetType, 资产ID) 集合。
+        """
+        expected = set()
+
+        song_catalog = SongCatalog.get_instance()
+        await song_catalog.ensure_loaded()
+        for song in song_catalog.songs:
+            expected.add((AssetType.COVER, str(get_cover_id(song["id"]))))
+
+        for resource, asset_type, key in (
+            (self.plate_list, AssetType.PLATE, "plates"),
+            (self.icon_list, AssetType.AVATAR, "icons"),
+        ):
+            resource.load_from_disk()
+            await resource.refresh()
+            for item in (resource.data or {}).get(key) or []:
+                expected.add((asset_type, str(item["id"])))
+
+        expected.update((AssetType.RANK, rank) for rank in RANK_IDS)
+        expected.update((AssetType.BADGE, badge) for badge in BADGE_IDS)
+        return expected
+
+    def diff(self, expected, verify_hash: bool = False, revalidate: bool = False):
+        """
+        与本地清单比对，得到需要下载的资产
+
+        Args:
+            expected (set): 应有的资产集合。
+            verify_hash (bool): 是否校验本地文件的 sha256。
+            revalidate (bool): 是否对已有资产也发起条件请求以检查远程变更。
+
+        Returns:
+            list: 需要请求的 (AssetType, 资产ID) 列表。
+        """
+        pending = []
+        for asset_type, asset_id in sorted(expected, key=lambda x: (x[0].name, x[1])):
+            key = f"{asset_type.name.lower()}/{asset_id}"
+            if not revalidate and self.assets.is_missing(key):
+                continue
+            local_path = self.assets.get_local_path(asset_type, asset_id)
+            if self.manifest.get(key) is None and local_path.exists():
+                # 清单建立之前就已下载的文件直接登记，不再重复下载
+                self.manifest.update_from_file(key, local_path)
+            if revalidate or not self.manifest.is_valid(key, local_path, verify_hash):
+                pending.append((asset_type, asset_id))
+        return pending
+
+    async def run(self, verify_hash: bool = False, revalidate: bool = False):
+        """
+        执行同步
+
+        Args:
+            verify_hash (bool): 是否校验本地文件的 sha256。
+            revalidate (bool): 是否对已有资产也发起条件请求以检查远程变更。
+        """
+        self.manifest.load()
+        expected = await self.collect_expected()
+        pending = self.diff(expected, verify_hash, revalidate)
+        logger.info("资产共 %d 个，需要同步 %d 个", len(expected), len(pending))
+
+        self._done = 0
+        self._total = len(pending)
+        self._failed = 0
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def worker(asset_type, asset_id):
+            async with semaphore:
+                await self._sync_one(asset_type, asset_id, revalidate)
+
+        try:
+            await asyncio.gather(*(worker(*item) for item in pending))
+        finally:
+            self.manifest.save()
+            self.assets.save_missing()
+        logger.info("资产同步完成：%d 个，失败 %d 个", self._total, self._failed)
+
+    async def _sync_one(self, asset_type: AssetType, asset_id: str, revalidate: bool):
+        key = f"{asset_type.name.lower()}/{asset_id}"
+        url = f"{self.assets.base_url}{asset_type.value}{asset_id}"
+        local_path = self.assets.get_local_path(asset_type, asset_id)
+        headers = {}
+        entry = self.manifest.get(key)
+        if revalidate and entry and entry.get("etag") and local_path.exists():
+            headers["If-None-Match"] = entry["etag"]
+
+        for attempt in range(1, self.retries + 1):
+            try:
+                async with HttpClient.get_instance().get(
+                    url, headers=headers, proxy=self.assets.proxy
+                ) as response:
+                    if response.status == 304:
+                        break
+                    if response.status == 404:
+                        self.assets.mark_missing(key)
+                        self.manifest.remove(key)
+                        break
+                    if response.status == 200:
+                        content = await response.read()
+                        Assets.save_file(local_path, content)
+                        self.assets.add_to_index(asset_type, asset_id)
+                        self.manifest.update(key, content, response.headers.get("ETag"))
+                        self.assets.clear_missing(key)
+                        break
+                    logger.warning("同步资产失败：%s %s", url, response.status)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logger.warning("同步资产失败：%s %s", url, e)
+            if attempt == self.retries:
+                self._failed += 1
+            else:
+                await asyncio.sleep(2 ** attempt)
+
+        self._done += 1
+        if self._done % self.SAVE_EVERY == 0:
+            self.manifest.save()
+        if self._done % self.SAVE_EVERY == 0 or self._done == self._total:
+            logger.info("同步进度：%d/%d", self._done, self._total)
@@ -7,9 +7,16 @@ from botpy import logger
 from botpy.message import Message, DirectMessage, GroupMessage
 from src.database.database_manager import create_tables
 
+from src.assets_generator.get_assets import Assets
 from src.bot.handler import command_handlers, default_handler
+from src.common.alias import AliasIndex
+from src.common.song_catalog import SongCatalog
+from src.draw.drawing_board import preload_fonts
+from src.draw.render_pool import RenderPool
 
 from src.utils.gpt import chat_history, chat_with_qianfan
+from src.utils.app_config import config
+from src.utils.http_client import HttpClient
 
 class MyClient(botpy.Client):
     """
@@ -18,6 +25,12 @@ class MyClient(botpy.Client):
 
     async def on_ready(self):
         await create_tables()
+        await HttpClient.get_instance().start()
+        Assets.get_instance().load_index()
+        preload_fonts()
+        RenderPool.get_instance(config.render_config.get("workers", 2)).start()
+        await SongCatalog.get_instance().ensure_loaded()
+        AliasIndex.get_instance().start_background_refresh()
         logger.info("robot 「%s」 on_ready!", self.robot.name)
 
     async def on_at_message_create(self, message: Message):
@@ -7,9 +7,12 @@ handler.py 中的 command_handler 装饰器用于注册命令处理函数
 from botpy.message import Message
 from botpy import logger, Client
 from src.draw.generator import generate_b50
+from src.draw.render_scheduler import RenderScheduler, SchedulerFullError
+from src.utils.app_config import config
 from src.utils.qmsg import send_admin_message
 from src.database.database_manager import create_or_update_user_by_id_name
-from src.common.alias import get_alias_by_id
+from src.common.alias import get_alias_by_id, get_song_ids_by_alias
+from src.common.song_catalog import SongCatalog
 from src.common.guess_song import GuessSongHandler
 
 command_handlers = {}
@@ -65,9 +68,27 @@ async def handle_b50_command(self, message: Message):
     logger.debug("%s", self.robot.name)
     message_text = get_raw_message(message.content).replace("/b50", "").strip()
     params = list(message_text)
-    _, msg, img = await generate_b50(message.author.id, message.author.avatar, params)
+
+    async def on_queued(position):
+        await message.reply(
+            content=f"@{message.author.username} {self.robot.name} 排队中，第{position}位"
+        )
+
+    scheduler = RenderScheduler.get_instance(
+        config.render_config.get("max_concurrency", 4),
+        config.render_config.get("max_queue", 32),
+    )
+    try:
+        # 同一用户、同样参数的请求合并为一次生成
+        _, msg, img = await scheduler.submit(
+            (message.author.id, "".join(sorted(set(params)))),
+            lambda: generate_b50(message.author.id, message.author.avatar, params),
+            on_queued,
+        )
+    except SchedulerFullError:
+        return "现在生成b50的人太多了，请稍后再试"
     if img:
-        await message.reply(file_image=str(img))
+        await message.reply(file_image=img)
     return msg
 
 
@@ -82,7 +103,18 @@ async def handle_alias_command(self, message: Message):
         if out:
             return f"ID{message_text}的别名有:\n{out}"
         return f"没有找到ID为{message_text}的曲目别名"
-    return f"{self.robot.name}:请后面输入曲目的ID查询别名哦"
+    if message_text:
+        song_ids = await get_song_ids_by_alias(message_text)
+        if not song_ids:
+            return f"没有找到别名为{message_text}的曲目"
+        song_catalog = SongCatalog.get_instance()
+        await song_catalog.ensure_loaded()
+        songs = []
+        for song_id in song_ids:
+            song = song_catalog.get_song(song_id)
+            songs.append(f"ID{song_id}: {song['title'] if song else '未知曲目'}")
+        return f"{message_text}可能是:\n" + "\n".join(songs)
+    return f"{self.robot.name}:请后面输入曲目的ID查询别名，或输入别名查询曲目哦"
 
 
 @command_handler("/曲绘猜歌")
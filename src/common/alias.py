@@ -2,8 +2,120 @@
 alias
 """
 
-import aiohttp
-from src.utils.app_config import config
+import asyncio
+from pathlib import Path
+
+from botpy import logger
+
+from src.utils.cached_resource import CachedJsonResource
+
+ALIAS_LIST_URL = "https://maimai.lxns.net/api/v0/maimai/alias/list"
+
+
+def normalize_alias(text: str) -> str:
+    """
+    别名归一化：去掉空格并转为小写。
+    """
+    return text.replace(" ", "").lower()
+
+
+class AliasIndex:
+    """
+    曲目别名索引，包含 ID -> 别名 的正向表和 归一化别名 -> ID 的倒排表。
+    """
+
+    _instance = None
+
+    @classmethod
+    def get_instance(
+        cls, cache_path: str = None, ttl: float = 3600, proxy: str = None
+    ):
+        """
+        获取单例实例
+        """
+        if cls._instance is None:
+            if cache_path is None:
+                raise ValueError("需要cache_path来初始化")
+            cls._instance = cls(cache_path, ttl, proxy)
+        return cls._instance
+
+    def __init__(
+        self, cache_path: str, ttl: float = 3600, proxy: str = None
+    ) -> None:
+        """
+        初始化
+
+        Args:
+            cache_path (str): 缓存目录。
+            ttl (float): 别名列表的刷新间隔(秒)。
+            proxy (str): 下载列表使用的代理，为空时直连。
+        """
+        if AliasIndex._instance is not None:
+            raise Exception("这是一个单例类，请使用 get_instance() 获取实例")
+        self.resource = CachedJsonResource(
+            ALIAS_LIST_URL, Path(cache_path, "alias_list.json"), ttl, proxy
+        )
+        self.aliases_by_id = {}
+        self.song_ids_by_alias = {}
+        self._loaded = False
+        self._refresh_task = None
+        AliasIndex._instance = self
+
+    async def ensure_loaded(self):
+        """
+        首次调用时从磁盘加载，磁盘上没有缓存时才会等待远程下载。
+        """
+        if self._loaded:
+            return
+        self._loaded = True
+        if self.resource.load_from_disk():
+            self._build_index()
+        else:
+            await self.resource.refresh(force=True)
+            self._build_index()
+
+    def start_background_refresh(self):
+        """
+        启动后台刷新任务，重复调用不会重复启动。
+        """
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh_loop())
+
+    async def _refresh_loop(self):
+        await self.ensure_loaded()
+        while True:
+            try:
+                if await self.resource.refresh():
+                    self._build_index()
+            except Exception as e:  # pylint: disable=broad-except
+                logger.error("刷新别名列表失败：%s", e)
+            await asyncio.sleep(min(self.resource.ttl, self.resource.RETRY_INTERVAL))
+
+    def _build_index(self):
+        aliases_by_id = {}
+        song_ids_by_alias = {}
+        for item in (self.resource.data or {}).get("aliases") or []:
+            song_id = item.get("song_id")
+            aliases = item.get("aliases") or []
+            aliases_by_id[song_id] = aliases
+            for alias in aliases:
+                song_ids_by_alias.setdefault(normalize_alias(alias), set()).add(
+                    song_id
+                )
+        self.aliases_by_id = aliases_by_id
+        self.song_ids_by_alias = song_ids_by_alias
+
+    def get_aliases(self, song_id: int) -> list:
+        """
+        获取曲目的所有别名
+        """
+        return self.aliases_by_id.get(song_id, [])
+
+    def find_song_ids(self, alias: str) -> list:
+        """
+        根据别名反查曲目 ID
+        """
+        return sorted(self.song_ids_by_alias.get(normalize_alias(alias), ()))
 
 
 async def get_alias_by_id(song_id: int) -> str:
@@ -16,15 +128,23 @@ async def get_alias_by_id(song_id: int) -> str:
     Returns:
         str: alias
     """
-    url = "https://maimai.lxns.net/api/v0/maimai/alias/list"
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url, proxy=config.proxy) as resp:
+    alias_index = AliasIndex.get_instance()
+    await alias_index.ensure_loaded()
+    aliases = alias_index.get_aliases(song_id)
+    if aliases:
+        return "\n".join(aliases)
 
-            if resp.status != 200:
-                return
-            data = await resp.json()
 
-            aliases = data.get("aliases")
-            for i in aliases:
-                if i.get("song_id") == song_id:
-                    return "\n".join(i.get("aliases"))
+async def get_song_ids_by_alias(alias: str) -> list:
+    """
+    get_song_ids_by_alias
+
+    Args:
+        alias (str): alias
+
+    Returns:
+        list: song_id 列表
+    """
+    alias_index = AliasIndex.get_instance()
+    await alias_index.ensure_loaded()
+    return alias_index.find_song_ids(alias)
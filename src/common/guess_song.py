@@ -2,22 +2,17 @@
 guess_song.py
 """
 
-import os
 import asyncio
 import random
-import time
-import tempfile
 from collections import Counter
 
-import aiohttp
-
 from botpy import Client, logger
 from botpy.message import Message
 from PIL import Image
 from src.assets_generator.get_assets import Assets, AssetType
-from src.common.alias import get_alias_by_id
-from src.utils.app_config import config
-from src.utils.common_utils import get_version_name
+from src.common.alias import AliasIndex, normalize_alias
+from src.common.song_catalog import SongCatalog, get_cover_id
+from src.utils.image_utils import image_to_bytes
 
 
 class GuessSongHandler:
@@ -51,21 +46,15 @@ class GuessSongHandler:
             # 防止重复初始化
             return
         self.guild = guild_id
-        self.temp_files = []
         self.current_song = None
-        self.alias_str = ""
+        self.aliases = []
         self.game_active = False
         self.initialized = True
 
     def __del__(self):
         """
-        清理临时文件和实例。
+        清理实例。
         """
-        for temp_file in self.temp_files:
-            try:
-                os.remove(temp_file)
-            except OSError:
-                pass
         if self.guild in self._instances:
             del self._instances[self.guild]
 
@@ -78,15 +67,21 @@ class GuessSongHandler:
             return
         self.game_active = True
         self.current_song = await self.choice_song()
-        self.alias_str = await get_alias_by_id(self.current_song["id"])
-        cover_path = await self.get_cover()
-        print(cover_path)
-        await self.send_message("请猜这首歌曲的名字！", msg_id, image=cover_path)
+        alias_index = AliasIndex.get_instance()
+        await alias_index.ensure_loaded()
+        self.aliases = alias_index.get_aliases(self.current_song["id"])
+        cover_data = await self.get_cover()
+        await self.send_message("请猜这首歌曲的名字！", msg_id, image=cover_data)
         await self.wait_for_guess()
 
     async def send_message(self, content, msg_id, image=None):
         """
         发送消息到指定频道。
+
+        Args:
+            content (str): 消息内容。
+            msg_id (str): 被回复的消息ID。
+            image (bytes or str, optional): 图片数据或本地图片路径。
         """
         channel_id = self.message.channel_id
         await self.client.api.post_message(
@@ -114,16 +109,24 @@ class GuessSongHandler:
         if not msg:
             return False
 
+        # 将用户的猜测也转换为小写，并移除空格
+        guess_lower = normalize_alias(msg)
+
+        # 完全命中标题或别名时直接查表
+        if guess_lower == normalize_alias(self.current_song["title"]):
+            return True
+        if self.current_song["id"] in AliasIndex.get_instance().find_song_ids(msg):
+            return True
+
         # 创建一个列表，包含歌曲标题和所有别名，并转换为小写，同时移除空格
-        possible_answers = [self.current_song["title"].replace(" ", "").lower()] + [
-            alias.replace(" ", "").lower()
-            for alias in (self.alias_str or "").split("\n")
+        possible_answers = [
+            answer
+            for answer in [normalize_alias(self.current_song["title"])]
+            + [normalize_alias(alias) for alias in self.aliases]
+            if answer
         ]
         logger.info("possible_answers: %s", possible_answers)
 
-        # 将用户的猜测也转换为小写，并移除空格
-        guess_lower = msg.replace(" ", "").lower()
-
         # 检查是否存在至少 20% 的连续字符匹配
         for answer in possible_answers:
             if self.get_max_match_length(guess_lower, answer) / len(answer) >= 0.2:
@@ -174,7 +177,9 @@ class GuessSongHandler:
                 {"name": "分类", "value": self.current_song["genre"]},
                 {
                     "name": "版本",
-                    "value": get_version_name(self.current_song["version"]),
+                    "value": SongCatalog.get_instance().get_version_name(
+                        self.current_song["version"]
+                    ),
                 },
                 {"name": "艺术家", "value": self.current_song["artist"]},
                 {"name": "BPM", "value": str(self.current_song["bpm"])},
@@ -185,25 +190,29 @@ class GuessSongHandler:
             )
 
         elif hint_type == "difficulty level":
-            # 合并难度列表
-            difficulties = []
-            if self.current_song["difficulties"]["dx"]:
-                difficulties.append(self.current_song["difficulties"]["dx"])
-            if self.current_song["difficulties"]["standard"]:
-                difficulties.append(self.current_song["difficulties"]["standard"])
+            # 合并 DX 和标准谱面的 Master 难度
+            song_catalog = SongCatalog.get_instance()
+            difficulties = [
+                chart
+                for chart in (
+                    song_catalog.get_difficulty(self.current_song["id"], "dx", 3),
+                    song_catalog.get_difficulty(self.current_song["id"], "standard", 3),
+                )
+                if chart
+            ]
             if difficulties:
                 chosen_difficulty = random.choice(difficulties)
                 # 随机选择提示难度等级或设计师
                 hint_list = [
-                    f"提示2: Master铺面难度等级为 {chosen_difficulty[3]['level']}",
-                    f"提示2: Master铺面作者为 {chosen_difficulty[3]['note_designer']}",
+                    f"提示2: Master铺面难度等级为 {chosen_difficulty['level']}",
+                    f"提示2: Master铺面作者为 {chosen_difficulty['note_designer']}",
                 ]
                 await self.send_message(random.choice(hint_list), msg_id)
 
         elif hint_type == "cover image":
             # 尝试获取封面图
-            cover_path = await self.get_cover(120, 120)
-            await self.send_message("提示3: 更大的曲绘", msg_id, image=cover_path)
+            cover_data = await self.get_cover(120, 120)
+            await self.send_message("提示3: 更大的曲绘", msg_id, image=cover_data)
 
     async def end_game(self):
         """
@@ -211,7 +220,9 @@ class GuessSongHandler:
         """
         self.game_active = False
         assets = Assets.get_instance()
-        cover = await assets.get(AssetType.COVER, self.current_song["id"])
+        cover = await assets.get(
+            AssetType.COVER, get_cover_id(self.current_song["id"])
+        )
         await self.send_message(
             f"正确答案是{self.current_song['title']}", self.message.id, image=cover
         )
@@ -230,21 +241,21 @@ class GuessSongHandler:
         """
         从曲目列表随机选择一首歌。
         """
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
-                "https://maimai.lxns.net/api/v0/maimai/song/list", proxy=config.proxy
-            ) as resp:
-                if resp.status != 200:
-                    return
-                data = await resp.json()
-                return random.choice(data.get("songs"))
+        song_catalog = SongCatalog.get_instance()
+        await song_catalog.ensure_loaded()
+        return song_catalog.random_song()
 
     async def get_cover(self, length=70, width=70):
         """
         获取歌曲封面的一部分。如果95%的像素都是同一种颜色，则重新生成。
+
+        Returns:
+            bytes: 裁剪后的图片(PNG)。
         """
         assets = Assets.get_instance()
-        cover = await assets.get(AssetType.COVER, self.current_song["id"])
+        cover = await assets.get(
+            AssetType.COVER, get_cover_id(self.current_song["id"])
+        )
         img = Image.open(cover)
 
         # 尝试最多5次找到一个合适的裁剪区域
@@ -263,13 +274,7 @@ class GuessSongHandler:
             # 检查是否满足95%的条件
             if most_common_color_count / (length * width) < 0.95:
                 # 如果没有95%都是同一种颜色，则使用这个裁剪的图片
-                temp_file = tempfile.mktemp(suffix=f"_{time.time()}_crop.png")
-                cropped_img.save(temp_file)
-                self.temp_files.append(temp_file)
-                return temp_file
+                return image_to_bytes(cropped_img)
 
         # 如果经过5次尝试后还未找到合适的图片，返回最后一次尝试的结果
-        temp_file = tempfile.mktemp(suffix=f"_{time.time()}_crop.png")
-        cropped_img.save(temp_file)
-        self.temp_files.append(temp_file)
-        return temp_file
+        return image_to_bytes(cropped_img)
@@ -0,0 +1,160 @@
+"""
+song_catalog.py - 全局共享的曲目目录。
+"""
+
+import bisect
+import random
+from pathlib import Path
+
+from src.utils.cached_resource import CachedJsonResource
+from src.utils.common_utils import get_version_name
+
+SONG_LIST_URL = "https://maimai.lxns.net/api/v0/maimai/song/list"
+
+
+def get_cover_id(song_id: int) -> int:
+    """
+    将落雪的曲目 ID 转换为封面资源的 ID(ID 大于 1000 时加 10000)。
+    """
+    if song_id > 1000:
+        return song_id + 10000
+    return song_id
+
+
+class SongCatalog:
+    """
+    落雪曲目列表的进程级缓存，提供按 ID、难度和版本的 O(1) 查询。
+    """
+
+    _instance = None
+
+    @classmethod
+    def get_instance(
+        cls, cache_path: str = None, ttl: float = 3600, proxy: str = None
+    ):
+        """
+        获取单例实例
+        """
+        if cls._instance is None:
+            if cache_path is None:
+                raise ValueError("需要cache_path来初始化")
+            cls._instance = cls(cache_path, ttl, proxy)
+        return cls._instance
+
+    def __init__(
+        self, cache_path: str, ttl: float = 3600, proxy: str = None
+    ) -> None:
+        """
+        初始化
+
+        Args:
+            cache_path (str): 缓存目录。
+            ttl (float): 曲目列表的有效期(秒)。
+            proxy (str): 下载列表使用的代理，为空时直连。
+        """
+        if SongCatalog._instance is not None:
+            raise Exception("这是一个单例类，请使用 get_instance() 获取实例")
+        self.resource = CachedJsonResource(
+            SONG_LIST_URL, Path(cache_path, "song_list.json"), ttl, proxy
+        )
+        self.songs = []
+        self._songs_by_id = {}
+        self._difficulties = {}
+        self._songs_by_version = {}
+        self._versions = []
+        self._version_codes = []
+        self._loaded = False
+        SongCatalog._instance = self
+
+    async def ensure_loaded(self):
+        """
+        首次调用时从磁盘加载，过期后从远程刷新。
+        """
+        if not self._loaded:
+            self._loaded = True
+            if self.resource.load_from_disk():
+                self._build_index()
+        if self.resource.is_stale and await self.resource.refresh():
+            self._build_index()
+
+    def _build_index(self):
+        data = self.resource.data or {}
+        self._versions = sorted(
+            data.get("versions") or [], key=lambda x: x["version"]
+        )
+        self._version_codes = [version["version"] for version in self._versions]
+
+        songs_by_id = {}
+        difficulties = {}
+        songs_by_version = {}
+        for song in data.get("songs") or []:
+            songs_by_id[song["id"]] = song
+            for song_type, charts in (song.get("difficulties") or {}).items():
+                for index, chart in enumerate(charts):
+                    level_index = chart.get("level_index", index)
+                    difficulties[(song["id"], song_type, level_index)] = chart
+            version = self._get_version_code(song.get("version", 0))
+            songs_by_version.setdefault(version, []).append(song)
+
+        self.songs = list(songs_by_id.values())
+        self._songs_by_id = songs_by_id
+        self._difficulties = difficulties
+        self._songs_by_version = songs_by_version
+
+    def _get_version_code(self, version):
+        index = bisect.bisect_right(self._version_codes, version) - 1
+        if index < 0:
+            return version
+        return self._version_codes[index]
+
+    def get_song(self, song_id: int):
+        """
+        按 ID 获取曲目
+
+        Returns:
+            dict: 曲目信息，找不到时返回 None。
+        """
+        return self._songs_by_id.get(song_id)
+
+    def get_difficulty(self, song_id: int, song_type: str, level_index: int):
+        """
+        获取曲目某一谱面的难度信息
+
+        Args:
+            song_id (int): 曲目 ID。
+            song_type (str): 谱面类型，standard / dx / utage。
+            level_index (int): 难度序号。
+
+        Returns:
+            dict: 谱面信息，找不到时返回 None。
+        """
+        return self._difficulties.get((song_id, song_type, level_index))
+
+    def get_songs_by_version(self, version: int):
+        """
+        获取某一版本中的所有曲目
+
+        Args:
+            version (int): 版本号，会归入所属的大版本。
+        """
+        return self._songs_by_version.get(self._get_version_code(version), [])
+
+    def get_version_name(self, version: int) -> str:
+        """
+        获取版本名称，曲目列表中没有版本信息时使用内置的版本表。
+        """
+        index = bisect.bisect_right(self._version_codes, version) - 1
+        if index < 0:
+            return get_version_name(version)
+        return self._versions[index]["title"]
+
+    def random_song(self):
+        """
+        随机选择一首曲目
+
+        Returns:
+            dict: 曲目信息，列表为空时返回 None。
+        """
+        if not self.songs:
+            return None
+        return random.choice(self.songs)
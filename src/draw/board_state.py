@@ -0,0 +1,189 @@
+"""
+This module stores each user's last rendered board for incremental re-renders.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+
+from botpy import logger
+from PIL import Image
+
+from src.utils.app_config import config
+
+
+def get_board_state_store():
+    """
+    Returns the store of last rendered boards.
+    """
+    cache_config = config.cache_config
+    return BoardStateStore.get_instance(
+        Path(cache_config.get("cache_path", "./static/cache"), "boards"),
+        cache_config.get("board_cache_mb", 1024) * 1024 * 1024,
+    )
+
+
+class BoardStateStore:
+    """
+    Keeps the last board of every user as raw pixels plus a JSON file with
+    its layout state (see MaimaiDrawingBoard.get_layout_state). Raw pixels
+    take more disk than a PNG, but storing and loading them costs no encode
+    or decode on the render path.
+
+    Once the directory grows past its size budget, the boards used least
+    recently (by file modification time, so every worker and restart agrees)
+    are removed first.
+    """
+
+    _instance = None
+
+    # How many saves between two checks of the directory size
+    PRUNE_EVERY = 20
+
+    @classmethod
+    def get_instance(cls, state_dir=None, max_bytes: int = 1024 * 1024 * 1024):
+        """
+        Get the singleton instance.
+        """
+        if cls._instance is None:
+            if state_dir is None:
+                raise ValueError("需要state_dir来初始化")
+            cls._instance = cls(state_dir, max_bytes)
+        return cls._instance
+
+    def __init__(self, state_dir, max_bytes: int = 1024 * 1024 * 1024) -> None:
+        """
+        Initialize the store.
+
+        Args:
+            state_dir (str): Directory of the stored boards.
+            max_bytes (int): Disk budget of the directory.
+        """
+        if BoardStateStore._instance is not None:
+            raise Exception("这是一个单例类，请使用 get_instance() 获取实例")
+        self.state_dir = Path(state_dir)
+        self.max_bytes = max_bytes
+        self.evictions = 0
+        self._saves = 0
+        BoardStateStore._instance = self
+
+    def load(self, board_key: str):
+        """
+        Load the last board of a user.
+
+        Args:
+            board_key (str): The board owner key.
+
+        Returns:
+            tuple: (PIL.Image.Image, dict), or (None, None) when there is no
+                usable board.
+        """
+        pixels_path = self.state_dir / f"{board_key}.raw"
+        state_path = self.state_dir / f"{board_key}.json"
+        try:
+            with open(state_path, "r", encoding="utf-8") as file:
+                state = json.load(file)
+            pixels = state["pixels"]
+            data = pixels_path.read_bytes()
+        except (OSError, ValueError, KeyError):
+            return None, None
+
+        # The two files are written one after the other, make sure they belong together
+        if hashlib.sha1(data).hexdigest() != pixels.get("sha1"):
+            return None, None
+        try:
+            img = Image.frombytes(pixels["mode"], tuple(pixels["size"]), data)
+        except (KeyError, TypeError, ValueError):
+            return None, None
+        try:
+            # 用修改时间记录最近使用，按 LRU 淘汰
+            os.utime(pixels_path)
+        except OSError:
+            pass
+        return img, state
+
+    def save(self, board_key: str, img, state: dict):
+        """
+        Store the board of a user.
+
+        Args:
+            board_key (str): The board owner key.
+            img (PIL.Image.Image): The board.
+            state (dict): The layout state of the board.
+        """
+        data = img.tobytes()
+        state = dict(
+            state,
+            pixels={
+                "mode": img.mode,
+                "size": list(img.size),
+                "sha1": hashlib.sha1(data).hexdigest(),
+            },
+        )
+        try:
+            self._write(self.state_dir / f"{board_key}.raw", data)
+            self._write(
+                self.state_dir / f"{board_key}.json",
+                json.dumps(state, ensure_ascii=False).encode("utf-8"),
+            )
+        except OSError as e:
+            logger.warning("保存画板状态失败：%s %s", board_key, e)
+            return
+
+        # The first save checks right away, so a directory left over the budget
+        # by an earlier run is cut down early
+        if self._saves % self.PRUNE_EVERY == 0:
+            self.prune()
+        self._saves += 1
+
+    def prune(self):
+        """
+        Remove the least recently used boards until the directory fits its budget.
+        """
+        # board key -> [last used, total size, file names]
+        boards = {}
+        try:
+            entries = [entry for entry in os.scandir(self.state_dir) if entry.is_file()]
+        except OSError:
+            return
+        for entry in entries:
+            if entry.name.startswith("."):
+                continue
+            board_key, extension = os.path.splitext(entry.name)
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            board = boards.setdefault(board_key, [0.0, 0, []])
+            if extension == ".raw":
+                board[0] = stat.st_mtime
+            board[1] += stat.st_size
+            board[2].append(entry.name)
+
+        total = sum(board[1] for board in boards.values())
+        for _, size, names in sorted(boards.values(), key=lambda board: board[0]):
+            if total <= self.max_bytes:
+                break
+            # JSON first, so that a half-removed board can never be loaded
+            for name in sorted(names, key=lambda name: not name.endswith(".json")):
+                try:
+                    os.remove(self.state_dir / name)
+                except OSError:
+                    pass
+            total -= size
+            self.evictions += 1
+
+    @staticmethod
+    def _write(path: Path, content: bytes):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix=".board_", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(content)
+            os.replace(temp_path, path)
+        except OSError:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
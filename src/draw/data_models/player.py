@@ -1,7 +1,7 @@
 from typing import List
 
-import aiohttp
-
+from src.common.song_catalog import SongCatalog
+from src.utils.http_client import HttpClient
 from .song import SongData
 
 
@@ -41,12 +41,59 @@ class Player:
         self.song_data_b35_total = 0
         self.api_secret = api_secret
 
+    def to_snapshot(self):
+        """
+        Returns a picklable snapshot of the player for rendering in another
+        process. The API secret is not included.
+        """
+        return {
+            "username": self.username,
+            "guild_id": self.guild_id,
+            "avatar_url": self.avatar_url,
+            "nickname": self.nickname,
+            "rating": self.rating,
+            "course_rank": self.course_rank,
+            "class_rank": self.class_rank,
+            "name_plate": self.name_plate,
+            "star": self.star,
+            "song_data_b15": [song.to_dict() for song in self.song_data_b15],
+            "song_data_b35": [song.to_dict() for song in self.song_data_b35],
+            "song_data_b15_total": self.song_data_b15_total,
+            "song_data_b35_total": self.song_data_b35_total,
+        }
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        """
+        Rebuilds a player from a snapshot made by to_snapshot.
+        """
+        player = cls(
+            username=snapshot["username"],
+            guild_id=snapshot["guild_id"],
+            avatar_url=snapshot["avatar_url"],
+            api_secret="",
+        )
+        for key in (
+            "nickname",
+            "rating",
+            "course_rank",
+            "class_rank",
+            "name_plate",
+            "star",
+            "song_data_b15_total",
+            "song_data_b35_total",
+        ):
+            setattr(player, key, snapshot[key])
+        player.song_data_b15 = [SongData(**song) for song in snapshot["song_data_b15"]]
+        player.song_data_b35 = [SongData(**song) for song in snapshot["song_data_b35"]]
+        return player
+
     async def fetch_divingfish(self):
         """
         Fetches data from Diving Fish.
         """
-        async with aiohttp.request(
-                "POST",
+        http_client = HttpClient.get_instance()
+        async with http_client.post(
                 "https://www.diving-fish.com/api/maimaidxprober/query/player",
                 json={"username": self.username, "b50": True},
         ) as resp:
@@ -76,8 +123,8 @@ class Player:
         auth_headers = {
             "Authorization": self.api_secret,
         }
-        async with aiohttp.request(
-                "GET",
+        http_client = HttpClient.get_instance()
+        async with http_client.get(
                 base_api + "/api/v0/maimai/player/qq/" + str(self.username),
                 headers=auth_headers,
         ) as resp:
@@ -111,24 +158,15 @@ class Player:
                 else None
             )
 
-        songs_data = []
-
-        async with aiohttp.request(
-                "GET",
-                base_api + "/api/v0/maimai/song/list",
-                headers=auth_headers
-        ) as resp:
-            if resp.status != 200:
-                return (
-                    resp.status,
-                    "maimai的查分机器人遇到了重大困难!!!"
-                )
-            obj = await resp.json()
-            songs_data = obj["songs"]
-            # print(songs_data)
+        song_catalog = SongCatalog.get_instance()
+        await song_catalog.ensure_loaded()
+        if not song_catalog.songs:
+            return (
+                503,
+                "maimai的查分机器人遇到了重大困难!!!"
+            )
 
-        async with aiohttp.request(
-                "GET",
+        async with http_client.get(
                 base_api + "/api/v0/maimai/player/" + str(friend_code) + "/bests",
                 headers=auth_headers,
         ) as resp:
@@ -147,10 +185,9 @@ class Player:
             
             def update_level_and_append(song_list, target_list):
                 for i in song_list:
-                    if songs_data:
-                        matching_song = next((song for song in songs_data if song["id"] == i["id"]), None)
-                        if matching_song:
-                            i["level"] = f'{matching_song["difficulties"][i["type"]][i["level_index"]]["level_value"]:.1f}'
+                    difficulty = song_catalog.get_difficulty(i["id"], i["type"], i["level_index"])
+                    if difficulty:
+                        i["level"] = f'{difficulty["level_value"]:.1f}'
 
                     song_data = SongData.from_data_luoxue(i)
                     target_list.append(song_data)
@@ -1,3 +1,6 @@
+from src.common.song_catalog import get_cover_id
+
+
 class SongData:
     def __init__(self, **kwargs):
         self.achievements = kwargs.get("achievements", 0)
@@ -14,13 +17,29 @@ class SongData:
         self.title = kwargs.get("title", "")
         self.type = kwargs.get("type", "")
 
+    def to_dict(self):
+        """
+        Returns the fields as keyword arguments accepted by the constructor.
+        """
+        return {
+            "achievements": self.achievements,
+            "ds": self.ds,
+            "dx_score": self.dx_score,
+            "fc": self.fc,
+            "fs": self.fs,
+            "level": self.level,
+            "level_index": self.level_index,
+            "rating": self.rating,
+            "rating_icon": self.rating_icon,
+            "id": self.song_id,
+            "title": self.title,
+            "type": self.type,
+        }
+
     @classmethod
     def from_data_luoxue(cls, data1):
-        id_value = data1.get("id", 0)
-
         # 处理 id 大于 1000 的情况
-        if id_value > 1000:
-            id_value += 10000
+        id_value = get_cover_id(data1.get("id", 0))
 
         return cls(
             achievements=data1["achievements"],
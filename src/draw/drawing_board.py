@@ -2,13 +2,34 @@
 This module provides the DrawingBoard class for creating images.
 """
 
-from pathlib import Path
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageDraw
 
 from src.utils.app_config import config
+from src.utils.font_registry import FontRegistry
+from src.utils.image_cache import ImageCache
+from src.utils.text_cache import TextBitmapCache
 from src.assets_generator.get_assets import Assets
 
 
+def get_layout_fonts():
+    """
+    Returns the (font file, size) pairs used by the board layout.
+    """
+    en_font = config.static_config["en_font"]
+    return [
+        *((en_font, size) for size in (16, 18, 19, 20, 30, 33, 36, 48)),
+        ("zh_yuan.otf", 20),
+        (config.static_config["mix_font"], 48),
+    ]
+
+
+def preload_fonts():
+    """
+    Loads every font the board layout uses into the font registry.
+    """
+    FontRegistry.get_instance().preload(get_layout_fonts())
+
+
 class DrawingBoard:
     """
     Represents a drawing board for creating images.
@@ -18,6 +39,8 @@ class DrawingBoard:
         self,
         main_img_path,
         resize=None,
+        copy_main_img=True,
+        main_img=None,
     ):
         """
         Initializes a DrawingBoard object.
@@ -25,16 +48,24 @@ class DrawingBoard:
         Args:
         - main_img_path (str): The path to the main image file.
         - resize (tuple, optional): The target size to resize the main image. Defaults to None.
+        - copy_main_img (bool, optional): Whether to copy the cached main image. Only
+          boards that replace main_img before drawing may pass False.
+        - main_img (PIL.Image.Image, optional): An image to draw on instead of loading
+          main_img_path. It is drawn on directly.
         """
         self.asstes = Assets.get_instance()
+        self.image_cache = ImageCache.get_instance()
         self.font_path = config.static_config["font_path"]
         self.en_font = config.static_config["en_font"]
         self.jp_font = config.static_config["jp_font"]
         self.mix_font = config.static_config["mix_font"]
-        self.main_img = Image.open(main_img_path)
+        # 缓存中的图片是共享的，画板需要在其上绘制，因此取副本
+        if main_img is None:
+            main_img = self.image_cache.open(
+                main_img_path, size=resize, copy=copy_main_img
+            )
+        self.main_img = main_img
         self.main_draw = ImageDraw.Draw(self.main_img)
-        if resize is not None:
-            self.main_img = self.main_img.resize(resize)
 
     def paste(self, img, position):
         """
@@ -64,7 +95,37 @@ class DrawingBoard:
         Returns:
         - PIL.ImageFont.FreeTypeFont: The font object.
         """
-        return ImageFont.truetype(str(Path(self.font_path, font)), size=size)
+        return FontRegistry.get_instance().get(font, size)
+
+    def draw_text(
+        self,
+        img,
+        position,
+        text,
+        size,
+        fill,
+        font=config.static_config["en_font"],
+        stroke_width=0,
+        stroke_fill=(0, 0, 0),
+        align="left",
+    ):
+        """
+        Draws text through the text bitmap cache, like ImageDraw.text.
+
+        Args:
+        - img (PIL.Image.Image): The image to draw on.
+        - position (tuple): The top-left anchor.
+        - text (str): The text, may contain line breaks.
+        - size (int): The font size.
+        - fill (tuple): The text color.
+        - font (str, optional): The font file name. Default en_font.
+        - stroke_width (int, optional): The stroke width. Default 0.
+        - stroke_fill (tuple, optional): The stroke color. Default black.
+        - align (str, optional): The alignment of multiline text. Default "left".
+        """
+        TextBitmapCache.get_instance().draw(
+            img, position, text, font, size, fill, stroke_width, stroke_fill, align
+        )
 
     def save(self, path):
         """
@@ -2,23 +2,30 @@
 This module contains the functions for generating maimai images.
 """
 
+import random
 import time
+from datetime import datetime
 from pathlib import Path
 
-import aiohttp
 from botpy import logger
+from src.assets_generator.get_assets import Assets, AssetType
 from src.database.base62_encoder import Base62Encoder
 from src.database.database_manager import (
     get_name_score_by_id,
     update_score_by_id,
 )
-from src.draw.maimai_drawing_board import MaimaiDrawingBoard
+from src.draw.maimai_drawing_board import BOARD_LAYOUT_VERSION, MaimaiDrawingBoard
+from src.draw.output_cache import OutputCache, get_render_input_key
+from src.draw.render_pool import RenderPool
+from src.draw.song_drawing_board import CARD_LAYOUT_VERSION
 from src.utils.app_config import config
 from src.utils.common_utils import (
     generate_boolean_with_probability,
     is_valid_luoxue_username,
 )
-from src.utils.image_utils import compress_png
+from src.utils.avatar_store import AvatarStore
+from src.utils.http_client import HttpClient
+from src.utils.image_encoder import get_output_encoder
 from .data_models.player import Player
 
 
@@ -26,19 +33,70 @@ async def heartbeat_request(url):
     """
     heartbeat request
     """
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url) as response:
-            if response.status == 200:
-                print("Heartbeat request successful!")
-            else:
-                print("Heartbeat request failed.")
+    async with HttpClient.get_instance().get(url) as response:
+        if response.status == 200:
+            print("Heartbeat request successful!")
+        else:
+            print("Heartbeat request failed.")
+
+
+def get_render_seed(username):
+    """
+    Get the seed of a board's random picks (background, badge, footer, plate).
+
+    Args:
+        username (str): The player's username.
+
+    Returns:
+        str: The seed, or None when render_config.seed_mode is "random".
+    """
+    seed_mode = config.render_config.get("seed_mode", "daily")
+    if seed_mode == "random":
+        return None
+    if seed_mode == "fixed":
+        return f"{username}:{config.render_config.get('seed', 0)}"
+    return f"{username}:{datetime.now().strftime('%Y/%m/%d')}"
+
+
+def get_board_input_key(snapshot, player: Player):
+    """
+    Hash the render input of a board without touching the network.
+
+    Args:
+        snapshot (dict): The render snapshot, the avatar is not needed.
+        player (Player): The player data.
+
+    Returns:
+        str: The key of the board in OutputCache.
+    """
+    assets = Assets.get_instance()
+    avatar = player.avatar_url
+    avatar_version = None
+    if avatar and avatar.startswith("http"):
+        avatar_version = AvatarStore.get_instance().get_version(avatar)
+    return get_render_input_key(
+        snapshot,
+        {
+            "board_layout": BOARD_LAYOUT_VERSION,
+            "card_layout": CARD_LAYOUT_VERSION,
+            "date": datetime.now().strftime("%Y/%m/%d"),
+            "avatar": [avatar, avatar_version],
+            # 素材下载完成后(占位图被替换)需要重新绘制
+            "local_assets": sorted(
+                f"{asset_type.name}/{asset_id}"
+                for asset_type, asset_id in MaimaiDrawingBoard.collect_assets(player)
+                if assets.has(asset_type, asset_id)
+            ),
+            "plates": assets.count_assets(AssetType.PLATE),
+        },
+    )
 
 
 async def generate_b50(
     userid,
     avatar_url,
     params,
-    output_path=Path(config.static_config["assets_path"], "images"),
+    output_path=Path(config.cache_config.get("cache_path", "./static/cache"), "output"),
 ):
     """
     Generate a maimai image with b50 information.
@@ -47,18 +105,19 @@ async def generate_b50(
         userid (str): The user ID.
         avatar_url (str): The avatar image path.
         params (list): Additional parameters for image generation.
-        output_path (str, optional): The output path for the generated image.
-            Defaults to os.path.join(context["assets_path"], "images").
+        output_path (str, optional): The output cache directory, see OutputCache.
+            Defaults to os.path.join(cache_config["cache_path"], "output").
 
     Returns:
-        tuple: A tuple containing the path to the generated image and the execution time.
+        tuple: The status code, the reply text and the encoded image (bytes, or
+            None on failure).
 
     Raises:
         int: The HTTP status code indicating the result of the generation process.
     """
     logger.debug("开始生成图片")
     time_start = time.time()
-    username, score = await get_name_score_by_id(userid)
+    username, _ = await get_name_score_by_id(userid)
 
     is_use_origin = "o" in params
     is_force_generate = "f" in params
@@ -94,56 +153,69 @@ async def generate_b50(
     logger.debug("获取玩家信息 -> %s", msg)
 
     filename = Base62Encoder.encode_string(username)
-
-    target_path = Path(
-        output_path, f'{filename}{"_origin" if is_use_origin else ""}.png'
-    )
-    target_path = Path(target_path)
-
-    # 是否强制生成
-    if not is_force_generate and target_path.exists() and score == player.rating:
-        return 201, "你的DX Rating没有变化", target_path
+    encoder = get_output_encoder(is_use_origin)
 
     logger.debug("更新玩家rating")
     # 更新玩家rating
     await update_score_by_id(userid, player.rating)
 
-    # 准备背景图片
+    # 准备背景图片，随机选择全部由种子决定，相同输入得到相同图片
+    seed = get_render_seed(username)
+    rng = random if seed is None else random.Random(f"{seed}:background")
     main_img_path = Path(
         config.static_config["assets_path"],
         "basic",
-        "main2.png" if generate_boolean_with_probability(10) else "main1.png",
+        "main2.png" if generate_boolean_with_probability(10, rng) else "main1.png",
     )
 
-    logger.debug("开始绘画")
-    # 开始绘画
-    maimai_pic = MaimaiDrawingBoard(
-        main_img_path=main_img_path,
-        player=player,
-        is_draw_title=False,
-        is_compress_img=True,
+    snapshot = {
+        "player": player.to_snapshot(),
+        "main_img_path": str(main_img_path),
+        "is_draw_title": False,
+        "avatar": None,
+        "seed": seed,
+        "board_key": filename,
+        "incremental": config.render_config.get("incremental", True)
+        and not is_force_generate,
+        "encoder": encoder,
+    }
+
+    # 渲染输入完全相同时直接使用缓存的图片，无需下载素材和头像
+    output_cache = OutputCache.get_instance(
+        output_path, config.cache_config.get("output_cache_mb", 256) * 1024 * 1024
     )
+    if not is_force_generate:
+        image_data = output_cache.get(
+            get_board_input_key(snapshot, player), encoder.extension
+        )
+        if image_data is not None:
+            return 201, "你的b50没有变化", image_data
 
-    await maimai_pic.draw()
-    maimai_pic.main_img.convert("RGB")
-    if not output_path.exists():
-        output_path.mkdir(parents=True)
-
-    origin_path = Path(output_path, f"{filename}_origin.png")
-    maimai_pic.save(origin_path)
-
-    compress_path = Path(output_path, f"{filename}.png")
-
-    compression_ratio = await compress_png(origin_path, compress_path)
-
-    if compression_ratio is None:
-        target_path = origin_path
-        logger.error("压缩失败 -- %s", compress_path)
+    logger.debug("准备素材")
+    # 并发下载绘图所需的全部素材
+    snapshot["avatar"] = await MaimaiDrawingBoard.prefetch_assets(
+        player, config.render_config.get("prefetch_concurrency", 16)
+    )
+    # 下载后本地素材和头像可能已变化，按下载后的输入保存，下次请求才能命中
+    input_key = get_board_input_key(snapshot, player)
 
-    logger.info("压缩比: %.2f%%", compression_ratio)
+    logger.debug("开始绘画")
+    # 在渲染进程池中绘画，避免阻塞事件循环
+    render_pool = RenderPool.get_instance(config.render_config.get("workers", 2))
+    encoded = await render_pool.render(snapshot)
+    output_cache.put(input_key, encoder.extension, encoded.data)
+
+    logger.info(
+        "编码 %s 质量 %d 大小 %dKB 用时 %.0fms 压缩比: %.2f%%",
+        encoder.backend,
+        encoded.quality,
+        len(encoded.data) // 1024,
+        encoded.elapsed * 1000,
+        encoded.ratio,
+    )
 
     time_end = time.time()
 
     msg += f"生成成功，用时{time_end - time_start:.2f}s"
     await heartbeat_request(config.heartbeat_url)
-    return 200, msg, target_path
+    return 200, msg, encoded.data
@@ -0,0 +1,109 @@
+"""
+This module provides a sprite atlas of stroked glyphs for numeric text.
+"""
+
+import threading
+
+from PIL import Image, ImageDraw
+
+from src.utils.font_registry import FontRegistry
+
+ATLAS_CHARS = "0123456789.-"
+
+
+class GlyphAtlas:
+    """
+    Pre-rasterized glyphs of one font, size and stroke width.
+
+    Each glyph is kept as two L masks (stroke and fill), so one atlas serves
+    every color: text is composed by pasting the stroke color through the
+    stroke mask, then the fill color through the fill mask, the same order
+    ImageDraw.text uses for stroked text.
+    """
+
+    _instances = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_instance(cls, font: str, size: int, stroke_width: int = 0):
+        """
+        Get the atlas of a font style, building it on first use.
+
+        Args:
+            font (str): The font file name.
+            size (int): The font size.
+            stroke_width (int): The stroke width.
+        """
+        key = (font, size, stroke_width)
+        atlas = cls._instances.get(key)
+        if atlas is None:
+            atlas = cls(FontRegistry.get_instance().get(font, size), stroke_width)
+            with cls._lock:
+                atlas = cls._instances.setdefault(key, atlas)
+        return atlas
+
+    def __init__(self, font, stroke_width: int = 0, chars: str = ATLAS_CHARS) -> None:
+        """
+        Rasterize the glyphs.
+
+        Args:
+            font (PIL.ImageFont.FreeTypeFont): The font.
+            stroke_width (int): The stroke width.
+            chars (str): The characters to rasterize.
+        """
+        self.stroke_width = stroke_width
+        # char -> (offset, stroke mask, fill mask, advance)
+        self._glyphs = {}
+        for char in chars:
+            left, top, right, bottom = font.getbbox(char, stroke_width=stroke_width)
+            size = (max(right - left, 1), max(bottom - top, 1))
+            stroke_mask = Image.new("L", size, 0)
+            ImageDraw.Draw(stroke_mask).text(
+                (-left, -top),
+                char,
+                font=font,
+                fill=255,
+                stroke_width=stroke_width,
+                stroke_fill=255,
+            )
+            fill_mask = Image.new("L", size, 0)
+            ImageDraw.Draw(fill_mask).text((-left, -top), char, font=font, fill=255)
+            self._glyphs[char] = ((left, top), stroke_mask, fill_mask, font.getlength(char))
+
+    def can_draw(self, text: str) -> bool:
+        """
+        Whether every character of the text is in the atlas.
+        """
+        return all(char in self._glyphs for char in text)
+
+    def draw(self, img, position, text: str, fill, stroke_fill=(0, 0, 0)) -> bool:
+        """
+        Draw text by pasting glyph sprites.
+
+        Args:
+            img (PIL.Image.Image): The image to draw on.
+            position (tuple): The top-left anchor, as for ImageDraw.text.
+            text (str): The text.
+            fill (tuple): The text color.
+            stroke_fill (tuple): The stroke color.
+
+        Returns:
+            bool: False when the text has characters outside the atlas; nothing is drawn then.
+        """
+        if not self.can_draw(text):
+            return False
+        placed = []
+        cursor = position[0]
+        for char in text:
+            (left, top), stroke_mask, fill_mask, advance = self._glyphs[char]
+            placed.append(
+                ((round(cursor) + left, position[1] + top), stroke_mask, fill_mask)
+            )
+            cursor += advance
+        # Strokes first for the whole text, so they never cover a neighbour's fill
+        if self.stroke_width:
+            for box, stroke_mask, _ in placed:
+                img.paste(stroke_fill, box, stroke_mask)
+        for box, _, fill_mask in placed:
+            img.paste(fill, box, fill_mask)
+        return True
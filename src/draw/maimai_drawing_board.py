@@ -2,20 +2,126 @@
 A module for drawing the Maimai game board.
 """
 
+import asyncio
+import hashlib
 import random
+from collections import namedtuple
 from datetime import datetime
+from io import BytesIO
 from pathlib import Path
+
+from botpy import logger
 from PIL import Image, ImageDraw
 
 from src.draw.drawing_board import DrawingBoard
-from src.draw.profile_drawing_board import ProfileDrawingBoard
-from src.draw.song_drawing_board import SongDrawingBoard
+from src.draw.profile_drawing_board import ProfileDrawingBoard, get_profile_cache
+from src.draw.render_cache import RenderedImageCache
+from src.draw.song_drawing_board import (
+    SongDrawingBoard,
+    get_song_card_cache,
+    warm_up_card_glyphs,
+)
+from src.draw.template_pool import TemplatePool
 from src.utils.common_utils import get_color_code_from_score
+from src.utils.image_cache import ImageCache
+from src.utils.avatar_store import AvatarStore
 from src.utils.image_utils import draw_rainbow_text
-from src.assets_generator.get_assets import AssetType
+from src.assets_generator.get_assets import Assets, AssetType
 
 from .data_models.player import Player
 
+FOOTER_IMG_LIST = ["UI_footer1.png", "UI_footer2.png", "UI_footer3.png"]
+
+# Bump when the board layout changes so that stored boards are not patched
+BOARD_LAYOUT_VERSION = 2
+
+# Positions of the frames that are part of the static layer
+SCORE_NV_POSITION = (315, 290)
+FOOTER_POSITION = (750, 2600)
+
+# Above this share of the board a full render is cheaper than patching
+INCREMENTAL_MAX_DIRTY_RATIO = 0.5
+
+# One drawn part of the board. rect is (left, top, right, bottom), key changes
+# whenever the pixels inside rect would change.
+LayoutElement = namedtuple("LayoutElement", ["name", "key", "rect", "draw"])
+
+
+def _content_key(*fields):
+    return hashlib.sha1(repr(fields).encode("utf-8")).hexdigest()
+
+
+def _intersects(rect_a, rect_b):
+    return (
+        rect_a[0] < rect_b[2]
+        and rect_b[0] < rect_a[2]
+        and rect_a[1] < rect_b[3]
+        and rect_b[1] < rect_a[3]
+    )
+
+
+def get_static_layer(main_img_path, footer_img_name):
+    """
+    Returns the background with the score frame and the footer template
+    already composed onto it. Shared: copy it before drawing.
+
+    Args:
+        main_img_path (str): The background image path.
+        footer_img_name (str): The footer template.
+
+    Returns:
+        PIL.Image.Image: The static layer.
+    """
+    static_cache = RenderedImageCache.get_instance(
+        "static_layer", 2 * len(FOOTER_IMG_LIST)
+    )
+    key = _content_key(str(main_img_path), footer_img_name, BOARD_LAYOUT_VERSION)
+    layer = static_cache.get(key)
+    if layer is None:
+        assets = Assets.get_instance()
+        image_cache = ImageCache.get_instance()
+        layer = image_cache.open(main_img_path, copy=True)
+        for path, position in (
+            (assets.generate_assets_path("title_base.png"), SCORE_NV_POSITION),
+            (assets.generate_assets_path(footer_img_name), FOOTER_POSITION),
+        ):
+            frame = image_cache.open(path)
+            layer.paste(frame, position, frame)
+        static_cache.put(key, layer)
+    return layer
+
+
+def warm_up_images():
+    """
+    Decode the static images every board uses into the image cache and the
+    card template pool, and build the card glyph atlases.
+    """
+    assets = Assets.get_instance()
+    image_cache = ImageCache.get_instance()
+    paths = [
+        (assets.generate_assets_path("main1.png"), None),
+        (assets.generate_assets_path("main2.png"), None),
+        (assets.generate_assets_path("title_base.png"), None),
+        (assets.generate_assets_path("name.png"), None),
+        (assets.generate_assets_path("characters", "rocket_small.png"), None),
+    ]
+    paths += [
+        (assets.generate_assets_path(f"UI_footer{i}.png"), None) for i in range(1, 4)
+    ]
+    for path, size in paths:
+        try:
+            image_cache.open(path, size=size)
+        except OSError as e:
+            logger.warning("预加载图片失败：%s %s", path, e)
+    TemplatePool.get_instance().warm_up()
+    warm_up_card_glyphs()
+    for background in ("main1.png", "main2.png"):
+        for footer_img_name in FOOTER_IMG_LIST:
+            try:
+                get_static_layer(assets.generate_assets_path(background), footer_img_name)
+            except OSError as e:
+                logger.warning("预合成静态图层失败：%s %s", background, e)
+
 
 class MaimaiDrawingBoard(DrawingBoard):
     """
@@ -28,6 +134,8 @@ class MaimaiDrawingBoard(DrawingBoard):
         player: Player,
         is_draw_title=True,
         is_compress_img=True,
+        prefetch_concurrency=16,
+        seed=None,
     ):
         """
         Initialize an instance of the MaimaiDrawingBoard class.
@@ -37,18 +145,98 @@ class MaimaiDrawingBoard(DrawingBoard):
             player (Player): The player data.
             is_draw_title (bool, optional): Whether to draw the title. Defaults to False.
             is_compress_img (bool, optional): Whether to compress the image. Defaults to True.
+            prefetch_concurrency (int, optional): Maximum concurrent asset downloads
+                during prefetch. Defaults to 16.
+            seed (str, optional): Seed of every random pick, so that the same input
+                gives the same image. Unseeded boards pick freely.
         """
-        super().__init__(main_img_path=main_img_path)
+        # render() starts from a copy of the static layer, no need to copy the background
+        super().__init__(main_img_path=main_img_path, copy_main_img=False)
+        self.main_img_path = str(main_img_path)
         self.player = player
 
         self.is_draw_title = is_draw_title
         self.is_compress_img = is_compress_img
+        self.prefetch_concurrency = prefetch_concurrency
+        self.avatar_image = None
+        self.avatar_key = None
+        self.seed = seed
+        self.rng = random if seed is None else random.Random(seed)
+        # Random picks (badge, footer, plate) of this board, kept across re-renders
+        self.choices = {}
+        self.redrawn = []
+        self._layout = None
+
+    @staticmethod
+    def collect_assets(player: Player):
+        """
+        Collect every remote asset a board for the player needs.
+
+        Args:
+            player (Player): The player data.
+
+        Returns:
+            set: (AssetType, id) pairs.
+        """
+        assets = set()
+        for song_data in player.song_data_b15 + player.song_data_b35:
+            assets.add((AssetType.COVER, song_data.song_id))
+            if song_data.rating_icon:
+                assets.add((AssetType.RANK, song_data.rating_icon))
+            if song_data.fc:
+                assets.add((AssetType.BADGE, f"{song_data.fc}"))
+            if song_data.fs:
+                assets.add((AssetType.BADGE, f"{song_data.fs}"))
+
+        if isinstance(player.name_plate, int):
+            assets.add((AssetType.PLATE, player.name_plate))
+        elif Assets.get_instance().count_assets(AssetType.PLATE) <= 10:
+            assets.add((AssetType.PLATE, 0))
+
+        avatar = player.avatar_url
+        if avatar and not avatar.startswith("http"):
+            assets.add((AssetType.AVATAR, avatar))
+        return assets
+
+    @staticmethod
+    async def prefetch_assets(player: Player, concurrency=16):
+        """
+        Fetch every asset a board for the player needs concurrently, so that
+        drawing only reads local files.
+
+        Args:
+            player (Player): The player data.
+            concurrency (int, optional): Maximum concurrent asset downloads.
 
-    async def draw_songs(
+        Returns:
+            bytes: The processed avatar (PNG) when the avatar is a URL, otherwise None.
+        """
+        tasks = [
+            Assets.get_instance().prefetch(
+                MaimaiDrawingBoard.collect_assets(player), concurrency
+            )
+        ]
+        avatar = player.avatar_url
+        if avatar and avatar.startswith("http"):
+            tasks.append(AvatarStore.get_instance().get(avatar))
+        results = await asyncio.gather(*tasks)
+        return results[1] if len(results) > 1 else None
+
+    def set_avatar_data(self, avatar_data):
+        """
+        Use downloaded avatar bytes for the profile plate.
+
+        Args:
+            avatar_data (bytes): The processed avatar from AvatarStore, or None.
+        """
+        self.avatar_image = Image.open(BytesIO(avatar_data)) if avatar_data else None
+        self.avatar_key = hashlib.sha1(avatar_data).hexdigest() if avatar_data else None
+
+    def get_song_slots(
         self, is_b15, position_b15=(100, 2050), position_b35=(100, 405)
     ):
         """
-        Draw song information on the main image.
+        Lay out the song cards of one section.
 
         Args:
             is_b15 (bool): Flag indicating whether the songs are B15 or B35.
@@ -56,6 +244,9 @@ class MaimaiDrawingBoard(DrawingBoard):
                 Defaults to (100, 2050).
             position_b35 (tuple, optional): The starting position to draw B35 songs.
                 Defaults to (100, 405).
+
+        Returns:
+            list: (SongData, position) pairs.
         """
         if is_b15:
             song_data_list = self.player.song_data_b15
@@ -67,21 +258,10 @@ class MaimaiDrawingBoard(DrawingBoard):
             position = position_b35
             position_x = position_b35[0]
             position_y = position_b35[1]
+        slots = []
         x, y = 0, 0
         for song_data in song_data_list:
-            base_color = ""
-            if song_data.achievements >= 100:
-                base_color = "_r"
-            elif song_data.achievements >= 99:
-                base_color = "_g"
-
-            main_img_path = self.asstes.generate_assets_path(
-                "base", f"{song_data.level_index}{base_color}.png"
-            )
-
-            song_plate = SongDrawingBoard(main_img_path, song_data, self.is_draw_title)
-            await song_plate.draw()
-            self.paste(song_plate, (position_x, position_y))
+            slots.append((song_data, (position_x, position_y)))
             x = x + 1
             position_x = position_x + 203
             if x == 6:
@@ -89,6 +269,55 @@ class MaimaiDrawingBoard(DrawingBoard):
                 position_x = position[0]
                 position_y = position_y + 267
                 x = 0
+        return slots
+
+    def draw_song_card(self, song_data, position, cache_key=None):
+        """
+        Draw one song card on the main image.
+
+        Args:
+            song_data (SongData): The song data.
+            position (tuple): The position of the card.
+            cache_key (str, optional): The card cache key, computed when omitted.
+        """
+        base_color = ""
+        if song_data.achievements >= 100:
+            base_color = "_r"
+        elif song_data.achievements >= 99:
+            base_color = "_g"
+
+        main_img_path = self.asstes.generate_assets_path(
+            "base", f"{song_data.level_index}{base_color}.png"
+        )
+
+        # Reuse a finished card when the same chart at the same score was drawn before
+        card_cache = get_song_card_cache()
+        if cache_key is None:
+            cache_key = SongDrawingBoard.get_cache_key(song_data, self.is_draw_title)
+        song_card = card_cache.get(cache_key)
+        if song_card is None:
+            song_plate = SongDrawingBoard(main_img_path, song_data, self.is_draw_title)
+            song_card = song_plate.draw()
+            card_cache.put(cache_key, song_card)
+        self.paste(song_card, position)
+
+    def draw_songs(
+        self, is_b15, position_b15=(100, 2050), position_b35=(100, 405)
+    ):
+        """
+        Draw song information on the main image.
+
+        Args:
+            is_b15 (bool): Flag indicating whether the songs are B15 or B35.
+            position_b15 (tuple, optional): The starting position to draw B15 songs.
+                Defaults to (100, 2050).
+            position_b35 (tuple, optional): The starting position to draw B35 songs.
+                Defaults to (100, 405).
+        """
+        for song_data, position in self.get_song_slots(
+            is_b15, position_b15, position_b35
+        ):
+            self.draw_song_card(song_data, position)
 
     def draw_rocket_decor(self, position=(1192, 2643)):
         """
@@ -101,28 +330,46 @@ class MaimaiDrawingBoard(DrawingBoard):
         # Implement the content of the draw_character method
         # Draw the rocket
         image_path = self.asstes.generate_assets_path("characters", "rocket_small.png")
-        character_img = Image.open(image_path)
+        character_img = self.image_cache.open(image_path)
         self.main_img.paste(character_img, position, character_img)
 
-    def draw_badge(self, position=(1145, 1725)):
+    def draw_badge(self, position=(1145, 1725), badge_name=None):
         """
         Draw the badge on the main image.
 
         Args:
             position (tuple, optional): The starting position to draw the badge.
                 Defaults to (1145, 1725).
+            badge_name (str, optional): The badge image name. Random when omitted.
         """
         # Implement the content of the draw_secondary_character method
-        random_number = random.randint(0, 16)
-        image_path = self.asstes.generate_assets_path(
-            "characters", f"yj{random_number}.png"
-        )
-        character_img = Image.open(image_path)
+        if badge_name is None:
+            badge_name = f"yj{self.rng.randint(0, 16)}.png"
+        image_path = self.asstes.generate_assets_path("characters", badge_name)
+        character_img = self.image_cache.open(image_path)
 
         self.main_img.paste(character_img, position, character_img)
 
-    async def draw_profile_plate(
-        self, rating, name, avatar, name_plate, position=(120, 75)
+    def choose_plate_path(self):
+        """
+        Returns the plate image path: the player's plate when known, otherwise
+        a random local plate.
+        """
+        if isinstance(self.player.name_plate, int):
+            return self.asstes.get_local(AssetType.PLATE, self.player.name_plate)
+        if self.asstes.count_assets(AssetType.PLATE) > 10:
+            return self.asstes.random_local_path(AssetType.PLATE, self.rng)
+        return self.asstes.get_local(AssetType.PLATE, 0)
+
+    def draw_profile_plate(
+        self,
+        rating,
+        name,
+        avatar,
+        name_plate,
+        position=(120, 75),
+        plate_filepath=None,
+        cache_key=None,
     ):
         """
         Draw a plate containing user information on the main image.
@@ -130,25 +377,26 @@ class MaimaiDrawingBoard(DrawingBoard):
         Args:
             rating (int): The user's rating.
             name (str): The username.
-            avatar (str): The user's avatar.
+            avatar (PIL.Image.Image or str): The user's avatar image or avatar id.
             name_plate (str): The name plate image.
             position (tuple, optional): The starting position to draw the profile plate.
                 Defaults to (120, 75).
+            plate_filepath (str, optional): The plate image path. Chosen by
+                choose_plate_path when omitted.
+            cache_key (str, optional): The header cache key, see
+                ProfileDrawingBoard.get_cache_key. The header is not cached when omitted.
         """
         # Implement the content of the draw_plate method
+        if plate_filepath is None:
+            plate_filepath = self.choose_plate_path()
 
-        if isinstance(self.player.name_plate, int):
-            plate_filepath = await self.asstes.get(
-                AssetType.PLATE, self.player.name_plate
-            )
-        else:
-            plate_file_list = [
-                x for x in Path(self.asstes.assets_folder, "plate").glob("*.png")
-            ]
-            if len(plate_file_list) > 10:
-                plate_filepath = str(random.choice(plate_file_list))
-            else:
-                plate_filepath = await self.asstes.get(AssetType.PLATE, 0)
+        # Reuse the finished header while rating, name, avatar and plate are unchanged
+        profile_cache = get_profile_cache()
+        if cache_key is not None:
+            header = profile_cache.get(cache_key)
+            if header is not None:
+                self.paste(header, position)
+                return
 
         profile_plate = ProfileDrawingBoard(
             plate_filepath,
@@ -157,10 +405,14 @@ class MaimaiDrawingBoard(DrawingBoard):
             avatar,
             name_plate,
         )
-        await profile_plate.draw()
-        self.paste(profile_plate, position)
+        header = profile_plate.draw()
+        if cache_key is not None:
+            profile_cache.put(cache_key, header)
+        self.paste(header, position)
 
-    def draw_score_nv(self, b15_scores, b35_scores, position=(315, 290)):
+    def draw_score_nv(
+        self, b15_scores, b35_scores, position=SCORE_NV_POSITION, draw_frame=True
+    ):
         """
         Draw B15 and B35 score information on the main image.
 
@@ -169,16 +421,24 @@ class MaimaiDrawingBoard(DrawingBoard):
             b35_scores (int): The B35 score.
             position (tuple, optional): The starting position to draw the scores.
                 Defaults to (315, 290).
+            draw_frame (bool, optional): Whether to draw the frame as well. False
+                when the main image already is the static layer.
         """
-        x = 130
-        y = 35
         b15_scores_q = int(b15_scores * 50 / 15)
         b35_scores_q = int(b35_scores * 50 / 35)
         font_size = 36
 
-        # Create a blank image for drawing
-        nv_img = Image.open(self.asstes.generate_assets_path("title_base.png"))
-        draw_f = ImageDraw.Draw(nv_img)
+        if draw_frame:
+            # Create a blank image for drawing
+            nv_img = self.image_cache.open(
+                self.asstes.generate_assets_path("title_base.png"), copy=True
+            )
+            x = 130
+            y = 35
+        else:
+            nv_img = self.main_img
+            x = position[0] + 130
+            y = position[1] + 35
 
         # Add rainbow effect for scores greater than 15000
         if b15_scores_q > 15000:
@@ -190,13 +450,13 @@ class MaimaiDrawingBoard(DrawingBoard):
                 self.asstes.generate_assets_path("gradient.png"),
             )
         else:
-            draw_f.text(
+            self.draw_text(
+                nv_img,
                 (x, y),
                 f"B15 -> {b15_scores}",
-                font=self.get_font(font_size),
-                fill=get_color_code_from_score(b15_scores_q),
+                font_size,
+                get_color_code_from_score(b15_scores_q),
                 stroke_width=2,
-                stroke_fill=(0, 0, 0),
             )
 
         if b35_scores_q > 15000:
@@ -208,28 +468,48 @@ class MaimaiDrawingBoard(DrawingBoard):
                 self.asstes.generate_assets_path("gradient.png"),
             )
         else:
-            draw_f.text(
+            self.draw_text(
+                nv_img,
                 (x + 270, y),
                 f"B35 -> {b35_scores}",
-                font=self.get_font(font_size),
-                fill=get_color_code_from_score(b15_scores_q),
+                font_size,
+                get_color_code_from_score(b15_scores_q),
                 stroke_width=2,
-                stroke_fill=(0, 0, 0),
             )
 
-        self.main_img.paste(nv_img, position, nv_img)
+        if draw_frame:
+            self.main_img.paste(nv_img, position, nv_img)
+
+    @staticmethod
+    def get_formatted_date():
+        """
+        Returns today's date as printed in the footer.
+        """
+        # Format the time as "xx/xx/xx"
+        return datetime.now().strftime("%Y/%m/%d")
 
-    def draw_footer(self, position=(750, 2600)):
+    def draw_footer(self, position=FOOTER_POSITION, footer_img_name=None, draw_frame=True):
         """
         Draw a footer containing song information on the main image.
+
+        Args:
+            position (tuple, optional): The position of the footer. Defaults to (750, 2600).
+            footer_img_name (str, optional): The footer template. Random when omitted.
+            draw_frame (bool, optional): Whether to draw the template as well. False
+                when the main image already is the static layer.
         """
         # Implement the content of the draw_footer method
         # Draw the footer
-        footer_img_list = ["UI_footer1.png", "UI_footer2.png", "UI_footer3.png"]
-        footer_img_name = random.choice(footer_img_list)
-        footer_img = Image.open(self.asstes.generate_assets_path(footer_img_name))
-        draw_f = ImageDraw.Draw(footer_img)
-        font = self.get_font(30)
+        if footer_img_name is None:
+            footer_img_name = self.rng.choice(FOOTER_IMG_LIST)
+        if draw_frame:
+            footer_img = self.image_cache.open(
+                self.asstes.generate_assets_path(footer_img_name), copy=True
+            )
+            origin = (0, 0)
+        else:
+            footer_img = self.main_img
+            origin = position
 
         if footer_img_name == "UI_footer2.png":
             x = 60
@@ -240,64 +520,321 @@ class MaimaiDrawingBoard(DrawingBoard):
         else:
             y = 75
             x = 40
+        x += origin[0]
+        y += origin[1]
         if self.player.song_data_b15_total > 0:
             b15_max = self.player.song_data_b15[0].rating
             b15_min = self.player.song_data_b15[-1].rating
 
-            draw_f.text(
-                (x, y), f"B15 -> MAX {b15_max} MIN {b15_min}", font=font, fill=(0, 0, 0)
+            self.draw_text(
+                footer_img, (x, y), f"B15 -> MAX {b15_max} MIN {b15_min}", 30, (0, 0, 0)
             )
 
         if self.player.song_data_b35_total > 0:
             b35_max = self.player.song_data_b35[0].rating
             b35_min = self.player.song_data_b35[-1].rating
-            draw_f.text(
+            self.draw_text(
+                footer_img,
                 (x, y := y + 50),
                 f"B35 -> MAX {b35_max} MIN {b35_min}",
-                font=font,
-                fill=(0, 0, 0),
+                30,
+                (0, 0, 0),
             )
 
-        font = self.get_font(20, "zh_yuan.otf")
-        current_time = datetime.now()
-
-        # Format the time as "xx/xx/xx"
-        formatted_time = current_time.strftime("%Y/%m/%d")
-        draw_f.text(
+        formatted_time = self.get_formatted_date()
+        self.draw_text(
+            footer_img,
             (x, y := y + 50),
             f"更多信息:b50.mpas.top/{self.player.username}",
-            font=font,
-            fill=(0, 0, 0),
+            20,
+            (0, 0, 0),
+            font="zh_yuan.otf",
         )
-        font = self.get_font(20, "zh_yuan.otf")
-        draw_f.text(
+        self.draw_text(
+            footer_img,
             (x, y + 30),
             f"Maimai的频道Bot {formatted_time}",
-            font=font,
-            fill=(0, 0, 0),
+            20,
+            (0, 0, 0),
+            font="zh_yuan.otf",
         )
 
-        self.paste(footer_img, position)
+        if draw_frame:
+            self.paste(footer_img, position)
 
-    async def draw(self):
+    def get_layout(self):
         """
-        Draw the complete image.
+        Lay out the board as z-ordered elements, bottom first.
+
+        Returns:
+            list: LayoutElement entries.
         """
-        await self.draw_profile_plate(
-            self.player.rating,
-            self.player.nickname,
-            self.player.avatar_url,
-            self.player.name_plate,
+        if self._layout is not None:
+            return self._layout
+
+        player = self.player
+        avatar = self.avatar_image
+        avatar_key = self.avatar_key
+        if avatar is None and not str(player.avatar_url or "").startswith("http"):
+            avatar = player.avatar_url
+            if avatar:
+                avatar_key = str(self.asstes.get_local(AssetType.AVATAR, avatar))
+
+        plate_filepath = self.choices.get("plate")
+        if (
+            isinstance(player.name_plate, int)
+            or plate_filepath is None
+            or not Path(plate_filepath).exists()
+        ):
+            plate_filepath = str(self.choose_plate_path())
+        self.choices["plate"] = plate_filepath
+        if "badge" not in self.choices:
+            self.choices["badge"] = f"yj{self.rng.randint(0, 16)}.png"
+        if "footer" not in self.choices:
+            self.choices["footer"] = self.rng.choice(FOOTER_IMG_LIST)
+        badge_name = self.choices["badge"]
+        footer_img_name = self.choices["footer"]
+
+        def sized_rect(position, path):
+            width, height = self.image_cache.open(path).size
+            return (position[0], position[1], position[0] + width, position[1] + height)
+
+        profile_key = ProfileDrawingBoard.get_cache_key(
+            plate_filepath, player.rating, player.nickname, avatar_key, player.name_plate
         )
-        await self.draw_songs(True)
-        await self.draw_songs(False)
-        self.draw_badge()
-        self.draw_score_nv(
-            self.player.song_data_b15_total, self.player.song_data_b35_total
+        layout = [
+            LayoutElement(
+                "profile",
+                profile_key,
+                (120, 75, 120 + 1160, 75 + 200),
+                lambda: self.draw_profile_plate(
+                    player.rating,
+                    player.nickname,
+                    avatar,
+                    player.name_plate,
+                    plate_filepath=plate_filepath,
+                    cache_key=profile_key,
+                ),
+            )
+        ]
+
+        for section, is_b15 in (("b15", True), ("b35", False)):
+            for i, (song_data, position) in enumerate(self.get_song_slots(is_b15)):
+                cache_key = SongDrawingBoard.get_cache_key(song_data, self.is_draw_title)
+                layout.append(
+                    LayoutElement(
+                        f"{section}_{i}",
+                        cache_key,
+                        (position[0], position[1], position[0] + 190, position[1] + 252),
+                        lambda s=song_data, p=position, k=cache_key: self.draw_song_card(
+                            s, p, k
+                        ),
+                    )
+                )
+
+        b15_total = player.song_data_b15_total
+        b35_total = player.song_data_b35_total
+        footer_values = (
+            [song_data.rating for song_data in player.song_data_b15[:1]]
+            + [song_data.rating for song_data in player.song_data_b15[-1:]]
+            + [song_data.rating for song_data in player.song_data_b35[:1]]
+            + [song_data.rating for song_data in player.song_data_b35[-1:]]
         )
+        layout += [
+            LayoutElement(
+                "badge",
+                badge_name,
+                sized_rect(
+                    (1145, 1725),
+                    self.asstes.generate_assets_path("characters", badge_name),
+                ),
+                lambda: self.draw_badge(badge_name=badge_name),
+            ),
+            LayoutElement(
+                "score_nv",
+                _content_key(b15_total, b35_total),
+                sized_rect(
+                    SCORE_NV_POSITION, self.asstes.generate_assets_path("title_base.png")
+                ),
+                lambda: self.draw_score_nv(b15_total, b35_total, draw_frame=False),
+            ),
+            # keep footer before rocket_decor
+            LayoutElement(
+                "footer",
+                _content_key(
+                    footer_img_name,
+                    b15_total,
+                    b35_total,
+                    footer_values,
+                    player.username,
+                    self.get_formatted_date(),
+                ),
+                sized_rect(
+                    FOOTER_POSITION, self.asstes.generate_assets_path(footer_img_name)
+                ),
+                lambda: self.draw_footer(
+                    footer_img_name=footer_img_name, draw_frame=False
+                ),
+            ),
+            LayoutElement(
+                "rocket_decor",
+                "rocket_small.png",
+                sized_rect(
+                    (1192, 2643),
+                    self.asstes.generate_assets_path("characters", "rocket_small.png"),
+                ),
+                self.draw_rocket_decor,
+            ),
+        ]
+        self._layout = layout
+        return layout
+
+    def get_layout_state(self):
+        """
+        Returns what render_incremental needs to patch this board later.
+
+        Returns:
+            dict: JSON-serializable layout state.
+        """
+        return {
+            "version": BOARD_LAYOUT_VERSION,
+            "background": self.get_static_layer_key(),
+            "size": list(self.main_img.size),
+            "choices": self.choices,
+            "elements": {
+                element.name: [element.key, list(element.rect)]
+                for element in self.get_layout()
+            },
+        }
+
+    def get_static_layer_key(self):
+        """
+        Returns which static layer the board is drawn on.
+        """
+        self.get_layout()
+        return f"{self.main_img_path}|{self.choices['footer']}"
 
-        # keep draw_footer before draw_rocket_decor
-        self.draw_footer()
-        self.draw_rocket_decor()
+    def start_from_static_layer(self):
+        """
+        Replace the main image with a copy of the precomposed static layer.
+        """
+        self.get_layout()
+        self.main_img = get_static_layer(
+            self.main_img_path, self.choices["footer"]
+        ).copy()
+        self.main_draw = ImageDraw.Draw(self.main_img)
 
+    def render(self):
+        """
+        Draw the complete image from local assets only.
+        """
+        layout = self.get_layout()
+        self.start_from_static_layer()
+        for element in layout:
+            element.draw()
+        self.redrawn = [element.name for element in layout]
         return self.main_img
+
+    def render_incremental(self, previous_img, previous_state):
+        """
+        Patch a previously rendered board: only elements whose key or position
+        changed are redrawn, on top of the previous image.
+
+        Overlapping elements are redrawn together (background first, then in
+        z-order), so the result matches a full render. Falls back to render()
+        when the previous board used another layout or background, or when
+        most of the board changed.
+
+        Args:
+            previous_img (PIL.Image.Image): The previous board. It is drawn on.
+            previous_state (dict): get_layout_state() of the previous board.
+
+        Returns:
+            PIL.Image.Image: The board.
+        """
+        if (
+            previous_img is None
+            or not previous_state
+            or previous_state.get("version") != BOARD_LAYOUT_VERSION
+        ):
+            return self.render()
+
+        # Keep the previous random picks so that they do not show up as changes.
+        # Seeded boards make the same picks anyway and must not depend on history.
+        if self.seed is None:
+            self.choices.update(previous_state.get("choices") or {})
+        layout = self.get_layout()
+        background = get_static_layer(self.main_img_path, self.choices["footer"])
+        if (
+            previous_state.get("background") != self.get_static_layer_key()
+            or previous_img.size != background.size
+            or previous_img.mode != background.mode
+        ):
+            return self.render()
+        previous_elements = previous_state.get("elements") or {}
+        current_names = {element.name for element in layout}
+
+        dirty = set()
+        dirty_rects = []
+        for element in layout:
+            previous = previous_elements.get(element.name)
+            if (
+                previous is None
+                or previous[0] != element.key
+                or tuple(previous[1]) != element.rect
+            ):
+                dirty.add(element.name)
+                dirty_rects.append(element.rect)
+                if previous is not None:
+                    dirty_rects.append(tuple(previous[1]))
+        for name, (_, rect) in previous_elements.items():
+            if name not in current_names:
+                dirty_rects.append(tuple(rect))
+
+        if not dirty_rects:
+            self.main_img = previous_img
+            self.main_draw = ImageDraw.Draw(self.main_img)
+            self.redrawn = []
+            return self.main_img
+
+        # Restoring a region wipes every element overlapping it, so those are
+        # redrawn as well, which in turn restores their regions
+        grown = True
+        while grown:
+            grown = False
+            for element in layout:
+                if element.name not in dirty and any(
+                    _intersects(element.rect, rect) for rect in dirty_rects
+                ):
+                    dirty.add(element.name)
+                    dirty_rects.append(element.rect)
+                    grown = True
+
+        width, height = self.main_img.size
+        clipped = []
+        for left, top, right, bottom in dirty_rects:
+            rect = (max(left, 0), max(top, 0), min(right, width), min(bottom, height))
+            if rect[0] < rect[2] and rect[1] < rect[3]:
+                clipped.append(rect)
+        dirty_area = sum((r[2] - r[0]) * (r[3] - r[1]) for r in clipped)
+        if dirty_area > width * height * INCREMENTAL_MAX_DIRTY_RATIO:
+            return self.render()
+
+        self.main_img = previous_img
+        self.main_draw = ImageDraw.Draw(self.main_img)
+        for rect in clipped:
+            self.main_img.paste(background.crop(rect), rect[:2])
+        for element in layout:
+            if element.name in dirty:
+                element.draw()
+        self.redrawn = [element.name for element in layout if element.name in dirty]
+        return self.main_img
+
+    async def draw(self):
+        """
+        Prefetch all assets, then draw the complete image.
+        """
+        self.set_avatar_data(
+            await self.prefetch_assets(self.player, self.prefetch_concurrency)
+        )
+        return self.render()
@@ -0,0 +1,217 @@
+"""
+This module caches finished boards by a hash of their render input.
+"""
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+from collections import OrderedDict
+from pathlib import Path
+
+from botpy import logger
+
+# Lossless boards written by older versions into assets_path/images. Their
+# compressed {base62 name}.png siblings cannot be told apart from downloaded
+# IMAGES assets in the same directory, so they are left alone.
+LEGACY_OUTPUT_NAME = re.compile(r"^[0-9A-Za-z]+_origin\.png$")
+
+
+def get_render_input_key(snapshot, extras=None):
+    """
+    Hash everything that decides how a board looks.
+
+    Args:
+        snapshot (dict): The render snapshot (see render_snapshot). Keys that do
+            not affect the pixels (board_key, incremental) are ignored, and so
+            is the avatar: the key is looked up before the avatar is fetched,
+            so pass its identity in extras instead.
+        extras (dict, optional): Further inputs, e.g. layout versions, the date
+            and the avatar version.
+
+    Returns:
+        str: The hex digest.
+    """
+    player = dict(snapshot["player"])
+    player.pop("guild_id", None)
+    encoder = snapshot.get("encoder")
+    normalized = {
+        "player": player,
+        "main_img_path": snapshot["main_img_path"],
+        "is_draw_title": snapshot["is_draw_title"],
+        "seed": snapshot.get("seed"),
+        "encoder": (
+            [encoder.backend, encoder.quality, encoder.max_bytes] if encoder else None
+        ),
+        "extras": extras or {},
+    }
+    data = json.dumps(normalized, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+def remove_legacy_outputs(legacy_dir):
+    """
+    Delete the {base62 name}_origin.png boards older versions wrote next to
+    the assets. Opt-in, see download.py --remove-legacy-outputs.
+
+    Args:
+        legacy_dir (str): The old output directory, assets_path/images.
+
+    Returns:
+        int: Number of files removed.
+    """
+    removed = 0
+    try:
+        entries = [entry for entry in os.scandir(legacy_dir) if entry.is_file()]
+    except OSError:
+        return 0
+    for entry in entries:
+        if not LEGACY_OUTPUT_NAME.match(entry.name):
+            continue
+        try:
+            os.remove(entry.path)
+            removed += 1
+        except OSError as e:
+            logger.warning("删除旧版输出图片失败：%s %s", entry.path, e)
+    logger.info("已删除 %d 张旧版输出图片：%s", removed, legacy_dir)
+    return removed
+
+
+class OutputCache:
+    """
+    Encoded boards on disk, named by their input hash and evicted least
+    recently used first once the directory grows past its size budget.
+
+    The directory belongs to the cache: every file in it counts against the
+    budget and is evicted the same way.
+    """
+
+    _instance = None
+
+    @classmethod
+    def get_instance(cls, cache_dir=None, max_bytes: int = 256 * 1024 * 1024):
+        """
+        Get the singleton instance.
+        """
+        if cls._instance is None:
+            if cache_dir is None:
+                raise ValueError("需要cache_dir来初始化")
+            cls._instance = cls(cache_dir, max_bytes)
+        return cls._instance
+
+    def __init__(self, cache_dir, max_bytes: int = 256 * 1024 * 1024) -> None:
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir (str): Directory of the cached boards.
+            max_bytes (int): Disk budget of the directory.
+        """
+        if OutputCache._instance is not None:
+            raise Exception("这是一个单例类，请使用 get_instance() 获取实例")
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # 文件名 -> 大小，按最近使用排序
+        self._files = None
+        OutputCache._instance = self
+
+    def _get_files(self):
+        if self._files is None:
+            self._files = OrderedDict()
+            try:
+                entries = [entry for entry in os.scandir(self.cache_dir) if entry.is_file()]
+            except OSError:
+                entries = []
+            for entry in sorted(entries, key=lambda e: e.stat().st_mtime):
+                if entry.name.startswith("."):
+                    continue
+                self._files[entry.name] = entry.stat().st_size
+                self.current_bytes += entry.stat().st_size
+        return self._files
+
+    def get(self, key: str, extension: str):
+        """
+        Look up a board.
+
+        Args:
+            key (str): The input hash.
+            extension (str): The file extension of the encoding.
+
+        Returns:
+            bytes: The encoded board, or None.
+        """
+        name = f"{key}.{extension}"
+        files = self._get_files()
+        if name not in files:
+            self.misses += 1
+            return None
+        path = self.cache_dir / name
+        try:
+            data = path.read_bytes()
+            # 用修改时间记录最近使用，重启后仍按 LRU 淘汰
+            os.utime(path)
+        except OSError:
+            self.current_bytes -= files.pop(name)
+            self.misses += 1
+            return None
+        files.move_to_end(name)
+        self.hits += 1
+        return data
+
+    def put(self, key: str, extension: str, data: bytes):
+        """
+        Store a board.
+
+        Args:
+            key (str): The input hash.
+            extension (str): The file extension of the encoding.
+            data (bytes): The encoded board.
+        """
+        name = f"{key}.{extension}"
+        files = self._get_files()
+        temp_path = None
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(
+                dir=self.cache_dir, prefix=".output_", suffix=".tmp"
+            )
+            with os.fdopen(fd, "wb") as file:
+                file.write(data)
+            os.replace(temp_path, self.cache_dir / name)
+        except OSError as e:
+            logger.warning("保存输出缓存失败：%s %s", name, e)
+            if temp_path is not None and os.path.exists(temp_path):
+                os.remove(temp_path)
+            return
+        self.current_bytes -= files.pop(name, 0)
+        files[name] = len(data)
+        self.current_bytes += len(data)
+        self._evict()
+
+    def _evict(self):
+        files = self._files
+        while self.current_bytes > self.max_bytes and len(files) > 1:
+            name, size = files.popitem(last=False)
+            self.current_bytes -= size
+            self.evictions += 1
+            try:
+                os.remove(self.cache_dir / name)
+            except OSError:
+                pass
+
+    def stats(self) -> dict:
+        """
+        Cache statistics.
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "files": len(self._files or {}),
+            "bytes": self.current_bytes,
+        }
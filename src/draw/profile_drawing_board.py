@@ -2,18 +2,39 @@
 This module represents a profile drawing board.
 """
 
-from PIL import Image, ImageDraw
+import hashlib
+from pathlib import Path
+
+from PIL import Image
 
 from src.draw.drawing_board import DrawingBoard
+from src.draw.render_cache import RenderedImageCache
+from src.utils.app_config import config
 from src.utils.common_utils import (
     has_only_common_characters,
     get_img_code_from_dx_rating,
 )
 
-from src.utils.image_utils import process_avatar, circle_corner
+from src.utils.image_utils import round_avatar
 
 from src.assets_generator.get_assets import AssetType
 
+# Bump when the header layout changes so that cached headers are not reused
+PROFILE_LAYOUT_VERSION = 1
+
+
+def get_profile_cache():
+    """
+    Returns the shared cache of finished profile headers.
+    """
+    cache_config = config.cache_config
+    spill_dir = None
+    if cache_config.get("profile_cache_spill", False):
+        spill_dir = Path(cache_config.get("cache_path", "./static/cache"), "profiles")
+    return RenderedImageCache.get_instance(
+        "profile", cache_config.get("profile_cache_size", 64), spill_dir
+    )
+
 
 class ProfileDrawingBoard(DrawingBoard):
     """
@@ -28,7 +49,8 @@ class ProfileDrawingBoard(DrawingBoard):
             main_img_path (str): The path to the main image.
             rating (int): The rating of the profile.
             name (str): The name of the profile.
-            avatar (image.pyi): The avatar image.
+            avatar (PIL.Image.Image or str): The processed avatar (see AvatarStore),
+                or a local avatar asset id.
             name_plate (str): The name plate image.
         """
         super().__init__(main_img_path, resize=(1160, 200))
@@ -37,7 +59,30 @@ class ProfileDrawingBoard(DrawingBoard):
         self.rating = int(rating)
         self.name_plate = name_plate
 
-    async def draw_rating_plate(self, position=(200, 17)):
+    @staticmethod
+    def get_cache_key(plate_filepath, rating, name, avatar_key, name_plate):
+        """
+        Returns a key that identifies the finished header.
+
+        Args:
+            plate_filepath (str): The plate image path.
+            rating (int): The rating of the profile.
+            name (str): The name of the profile.
+            avatar_key (str): Identifies the avatar pixels, e.g. a hash of the
+                processed avatar or the local avatar path.
+            name_plate (str): The name plate image.
+        """
+        fields = (
+            PROFILE_LAYOUT_VERSION,
+            str(plate_filepath),
+            int(rating),
+            str(name),
+            avatar_key,
+            name_plate,
+        )
+        return hashlib.sha1(repr(fields).encode("utf-8")).hexdigest()
+
+    def draw_rating_plate(self, position=(200, 17)):
         """
         Draw the rating plate on the profile drawing board.
 
@@ -45,27 +90,27 @@ class ProfileDrawingBoard(DrawingBoard):
             position (tuple, optional): The position of the rating plate. Defaults to (200, 17).
         """
         # Get the rating plate image
-        rating_plate_img = Image.open(
+        rating_plate_img = self.image_cache.open(
             self.asstes.generate_assets_path(
                 "dx_rating",
                 f"UI_CMN_DXRating_S_{get_img_code_from_dx_rating(self.rating)}_waifu2x_2x_png.png",
-            )
+            ),
+            size=(348, 72),
+            copy=True,
         )
-        rating_plate_img = rating_plate_img.resize((348, 72))
-        rating_plate_draw = ImageDraw.Draw(rating_plate_img)
-        rating_plate_draw.text(
+        self.draw_text(
+            rating_plate_img,
             (175, 20),
             " ".join(str(self.rating)),
-            font=(self.get_font(33)),
-            fill=(255, 215, 0),
+            33,
+            (255, 215, 0),
             stroke_width=2,
-            stroke_fill=(0, 0, 0),
             align="center",
         )
 
         self.paste(rating_plate_img, position)
 
-    async def draw_avatar(self, position=(7, 8)):
+    def draw_avatar(self, position=(7, 8)):
         """
         Draw the avatar on the profile drawing board.
 
@@ -74,49 +119,47 @@ class ProfileDrawingBoard(DrawingBoard):
         """
 
         if self.avatar:
-            if self.avatar.startswith("http"):
-                avatar_image = await process_avatar(self.avatar)
+            if isinstance(self.avatar, Image.Image):
+                # Downloaded avatars arrive already resized and rounded
+                avatar_image = self.avatar.convert("RGBA")
             else:
-                avatar_path = await self.asstes.get(AssetType.AVATAR, self.avatar)
-                avatar_image = Image.open(avatar_path)
-
-            # Convert the image to RGB mode (remove transparency)
-            avatar_image = avatar_image.convert("RGBA")
-
-            avatar_image = avatar_image.resize((185, 185))
-
-            # Apply circle corner to the avatar
-            avatar_image = circle_corner(avatar_image, radii=15)
+                avatar_path = str(self.asstes.get_local(AssetType.AVATAR, self.avatar))
+                avatar_cache = RenderedImageCache.get_instance("avatar", 64)
+                avatar_image = avatar_cache.get(avatar_path)
+                if avatar_image is None:
+                    avatar_image = round_avatar(self.image_cache.open(avatar_path))
+                    avatar_cache.put(avatar_path, avatar_image)
             self.paste(avatar_image, position)
 
-    async def draw_name_plate(self, position=(200, 99)):
+    def draw_name_plate(self, position=(200, 99)):
         """
         Draw the name plate on the profile drawing board.
 
         Args:
             position (tuple, optional): The position of the name plate. Defaults to (120, 75).
         """
-        name_plate_img = Image.open(self.asstes.generate_assets_path("name.png"))
-        name_plate_draw = ImageDraw.Draw(name_plate_img)
+        name_plate_img = self.image_cache.open(
+            self.asstes.generate_assets_path("name.png"), copy=True
+        )
         name = str(self.name)  # Fix: Replace 'name' with 'self.name'
         # Choose font based on the name content
         if has_only_common_characters(name):
-            font = self.get_font(48)
+            font = self.en_font
         else:
-            font = self.get_font(48, font=self.mix_font)
+            font = self.mix_font
 
-        name_plate_draw.text((12, 16), name, font=font, fill=(0, 0, 0))
+        self.draw_text(name_plate_img, (12, 16), name, 48, (0, 0, 0), font=font)
 
         self.paste(name_plate_img, position)
 
-    async def draw(self):
+    def draw(self):
         """
         Draw the profile drawing board.
 
         Returns:
             Image: The profile drawing board image.
         """
-        await self.draw_rating_plate()
-        await self.draw_name_plate()
-        await self.draw_avatar()
+        self.draw_rating_plate()
+        self.draw_name_plate()
+        self.draw_avatar()
         return self.main_img
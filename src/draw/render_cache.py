@@ -0,0 +1,161 @@
+"""
+This module provides an LRU cache for finished board parts.
+"""
+
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from botpy import logger
+from PIL import Image
+
+
+class RenderedImageCache:
+    """
+    An in-memory LRU of rendered images keyed by a content hash, optionally
+    spilled to disk as PNG files so that other workers and restarts can reuse them.
+
+    Cached images are shared: paste them, never draw on them.
+    """
+
+    _instances = {}
+
+    # How many puts between two checks of the spill directory size
+    PRUNE_EVERY = 100
+
+    @classmethod
+    def get_instance(
+        cls, name: str, max_items: int = 256, spill_dir=None, max_spill_files=20000
+    ):
+        """
+        Get the cache registered under the name, creating it on first use.
+        """
+        if name not in cls._instances:
+            cls._instances[name] = cls(name, max_items, spill_dir, max_spill_files)
+        return cls._instances[name]
+
+    def __init__(
+        self, name: str, max_items: int = 256, spill_dir=None, max_spill_files=20000
+    ) -> None:
+        """
+        Initialize the cache.
+
+        Args:
+            name (str): The cache name, used in logs.
+            max_items (int): Maximum number of images kept in memory.
+            spill_dir (str, optional): Directory for the PNG copies. None disables spilling.
+            max_spill_files (int): Maximum number of files kept in spill_dir.
+        """
+        self.name = name
+        self.max_items = max_items
+        self.spill_dir = Path(spill_dir) if spill_dir else None
+        self.max_spill_files = max_spill_files
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._images = OrderedDict()
+        self._puts = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        """
+        Look up an image.
+
+        Args:
+            key (str): The content hash.
+
+        Returns:
+            PIL.Image.Image: The cached image, or None.
+        """
+        with self._lock:
+            img = self._images.get(key)
+            if img is not None:
+                self._images.move_to_end(key)
+                self.hits += 1
+                return img
+
+        if self.spill_dir is not None:
+            spill_path = self.spill_dir / f"{key}.png"
+            try:
+                img = Image.open(spill_path)
+                img.load()
+            except (OSError, ValueError):
+                img = None
+            if img is not None:
+                with self._lock:
+                    self.disk_hits += 1
+                    self._remember(key, img)
+                return img
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, img):
+        """
+        Store an image.
+
+        Args:
+            key (str): The content hash.
+            img (PIL.Image.Image): The rendered image. Do not modify it afterwards.
+        """
+        with self._lock:
+            self._remember(key, img)
+            self._puts += 1
+            should_prune = self._puts % self.PRUNE_EVERY == 0
+
+        if self.spill_dir is not None:
+            spill_path = self.spill_dir / f"{key}.png"
+            if not spill_path.exists():
+                self._spill(spill_path, img)
+            if should_prune:
+                self._prune_spill()
+
+    def _remember(self, key, img):
+        self._images[key] = img
+        self._images.move_to_end(key)
+        while len(self._images) > self.max_items:
+            self._images.popitem(last=False)
+
+    def _spill(self, spill_path: Path, img):
+        temp_path = None
+        try:
+            spill_path.parent.mkdir(parents=True, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(
+                dir=spill_path.parent, prefix=".spill_", suffix=".tmp"
+            )
+            with os.fdopen(fd, "wb") as file:
+                img.save(file, format="PNG")
+            os.replace(temp_path, spill_path)
+        except OSError as e:
+            logger.warning("缓存写入磁盘失败：%s %s", spill_path, e)
+            if temp_path is not None and os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def _prune_spill(self):
+        try:
+            files = [entry for entry in os.scandir(self.spill_dir) if entry.is_file()]
+        except OSError:
+            return
+        if len(files) <= self.max_spill_files:
+            return
+        files.sort(key=lambda entry: entry.stat().st_mtime)
+        for entry in files[: len(files) - self.max_spill_files]:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+
+    def stats(self) -> dict:
+        """
+        Cache statistics.
+        """
+        return {
+            "name": self.name,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "items": len(self._images),
+        }
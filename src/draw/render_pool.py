@@ -0,0 +1,224 @@
+"""
+This module runs board rendering off the event loop in a process pool.
+"""
+
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from botpy import logger
+
+from src.draw.board_state import get_board_state_store
+from src.draw.drawing_board import preload_fonts
+from src.draw.maimai_drawing_board import MaimaiDrawingBoard, warm_up_images
+from src.draw.profile_drawing_board import get_profile_cache
+from src.draw.song_drawing_board import get_song_card_cache
+from src.utils.font_registry import FontRegistry
+from src.utils.image_cache import ImageCache
+from src.utils.app_config import config
+from src.utils.image_encoder import ImageEncoder
+from src.utils.text_cache import TextBitmapCache
+from .data_models.player import Player
+
+
+def get_worker_cache_budgets(workers: int):
+    """
+    Split the in-memory cache budgets of cache_config between the workers.
+    Every worker process has its own caches, so without the split the pool
+    would hold workers times the configured budgets.
+
+    Args:
+        workers (int): Number of worker processes.
+
+    Returns:
+        dict: The budgets of one worker, see apply_cache_budgets.
+    """
+    cache_config = config.cache_config
+    share = max(workers, 1)
+    mb = 1024 * 1024
+    return {
+        "image_cache_bytes": cache_config.get("image_cache_mb", 128) * mb // share,
+        "text_cache_bytes": cache_config.get("text_cache_mb", 16) * mb // share,
+        "card_cache_size": max(cache_config.get("card_cache_size", 256) // share, 1),
+        "profile_cache_size": max(
+            cache_config.get("profile_cache_size", 64) // share, 1
+        ),
+    }
+
+
+def apply_cache_budgets(budgets):
+    """
+    Resize the caches of this process.
+
+    Args:
+        budgets (dict): See get_worker_cache_budgets.
+    """
+    ImageCache.get_instance().max_bytes = budgets["image_cache_bytes"]
+    TextBitmapCache.get_instance().max_bytes = budgets["text_cache_bytes"]
+    get_song_card_cache().max_items = budgets["card_cache_size"]
+    get_profile_cache().max_items = budgets["profile_cache_size"]
+
+
+def init_worker(budgets=None):
+    """
+    Worker initializer: set the cache budgets, then preload fonts and the
+    static base images.
+
+    Args:
+        budgets (dict, optional): The cache budgets of the worker. The caches
+            keep the budgets of cache_config when omitted.
+    """
+    if budgets is not None:
+        apply_cache_budgets(budgets)
+    preload_fonts()
+    warm_up_images()
+
+
+def log_cache_stats():
+    """
+    Log the statistics of the caches in this process. Every worker has its own
+    caches, so they are logged where the rendering happens.
+    """
+    logger.debug("图片缓存 -> %s", ImageCache.get_instance().stats())
+    logger.debug("字体缓存 -> %s", FontRegistry.get_instance().stats())
+    logger.debug("文字缓存 -> %s", TextBitmapCache.get_instance().stats())
+    logger.debug("卡片缓存 -> %s", get_song_card_cache().stats())
+    logger.debug("玩家信息缓存 -> %s", get_profile_cache().stats())
+
+
+def render_snapshot(snapshot):
+    """
+    Render a b50 board from a snapshot.
+
+    Args:
+        snapshot (dict): The render input with keys
+            - player (dict): Player.to_snapshot() output.
+            - main_img_path (str): The background image path.
+            - is_draw_title (bool): Whether to draw song titles.
+            - avatar (bytes): The downloaded avatar, or None.
+            - seed (str, optional): Seed of the board's random picks.
+            - board_key (str, optional): Owner of the board.
+            - incremental (bool, optional): Patch the owner's last board instead
+              of drawing from scratch, and store this board for the next time.
+              Needs board_key.
+            - encoder (ImageEncoder, optional): Output encoder. Lossless PNG
+              when omitted.
+
+    Returns:
+        EncodedImage: The encoded board.
+    """
+    board = MaimaiDrawingBoard(
+        main_img_path=snapshot["main_img_path"],
+        player=Player.from_snapshot(snapshot["player"]),
+        is_draw_title=snapshot["is_draw_title"],
+        seed=snapshot.get("seed"),
+    )
+    board.set_avatar_data(snapshot["avatar"])
+
+    board_key = snapshot.get("board_key")
+    state_store = None
+    if board_key and snapshot.get("incremental"):
+        state_store = get_board_state_store()
+    if state_store is not None:
+        previous_img, previous_state = state_store.load(board_key)
+        img = board.render_incremental(previous_img, previous_state)
+    else:
+        img = board.render()
+    logger.debug("重绘了 %d 个画板元素", len(board.redrawn))
+
+    encoder = snapshot.get("encoder") or ImageEncoder("png")
+    encoded = encoder.encode(img)
+    if state_store is not None:
+        state_store.save(board_key, img, board.get_layout_state())
+    log_cache_stats()
+    return encoded
+
+
+class RenderPool:
+    """
+    A process pool that renders boards without blocking the bot's event loop.
+    """
+
+    _instance = None
+
+    @classmethod
+    def get_instance(cls, workers: int = 2):
+        """
+        Get the singleton instance.
+        """
+        if cls._instance is None:
+            cls._instance = cls(workers)
+        return cls._instance
+
+    def __init__(self, workers: int = 2) -> None:
+        """
+        Initialize the pool.
+
+        Args:
+            workers (int): Number of worker processes. 0 renders in the default
+                thread pool instead, which still keeps the event loop free.
+        """
+        if RenderPool._instance is not None:
+            raise Exception("这是一个单例类，请使用 get_instance() 获取实例")
+        self.workers = workers
+        self._executor = None
+        self._warmed_up = False
+        RenderPool._instance = self
+
+    def start(self):
+        """
+        Start the worker processes and run their warm-up.
+        """
+        if self._executor is not None:
+            return
+        if self.workers <= 0:
+            # 在当前进程中渲染，预热也在当前进程中进行
+            if not self._warmed_up:
+                init_worker()
+                self._warmed_up = True
+            return
+        # spawn: do not fork the bot process with its open sockets and threads
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=init_worker,
+            initargs=(get_worker_cache_budgets(self.workers),),
+        )
+        for _ in range(self.workers):
+            self._executor.submit(int)
+        logger.info(
+            "渲染进程池已启动 workers=%s 每个进程的缓存预算 %s",
+            self.workers,
+            get_worker_cache_budgets(self.workers),
+        )
+
+    def shutdown(self):
+        """
+        Stop the worker processes.
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def render(self, snapshot):
+        """
+        Render a board in the pool.
+
+        Args:
+            snapshot (dict): See render_snapshot.
+
+        Returns:
+            EncodedImage: The encoded board.
+        """
+        self.start()
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(
+                self._executor, render_snapshot, snapshot
+            )
+        except BrokenProcessPool:
+            # 有工作进程异常退出，丢弃进程池，下次渲染时重新创建
+            logger.error("渲染进程池已损坏，将重新创建")
+            self.shutdown()
+            raise
@@ -0,0 +1,144 @@
+"""
+This module limits how many boards are generated at the same time.
+"""
+
+import asyncio
+import time
+
+from botpy import logger
+
+
+class SchedulerFullError(Exception):
+    """
+    Raised when the render queue is full.
+    """
+
+
+class RenderScheduler:
+    """
+    Runs board jobs with a global concurrency cap and a bounded queue.
+
+    Jobs submitted under the key of a job that is still queued or running
+    share that job's result instead of starting another one.
+    """
+
+    _instance = None
+
+    @classmethod
+    def get_instance(cls, max_concurrency: int = 4, max_queue: int = 32):
+        """
+        Get the singleton instance.
+        """
+        if cls._instance is None:
+            cls._instance = cls(max_concurrency, max_queue)
+        return cls._instance
+
+    def __init__(self, max_concurrency: int = 4, max_queue: int = 32) -> None:
+        """
+        Initialize the scheduler.
+
+        Args:
+            max_concurrency (int): Maximum number of jobs running at once.
+            max_queue (int): Maximum number of jobs waiting to run.
+        """
+        if RenderScheduler._instance is not None:
+            raise Exception("这是一个单例类，请使用 get_instance() 获取实例")
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self._semaphore = None
+        self._jobs = {}
+        self._running = 0
+        self._waiting = 0
+        self.submitted = 0
+        self.coalesced = 0
+        self.rejected = 0
+        self.failed = 0
+        self.completed = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        RenderScheduler._instance = self
+
+    async def submit(self, key, job, on_queued=None):
+        """
+        Run a job, or join the job already submitted under the same key.
+
+        Args:
+            key (hashable): The job key, e.g. the user and the render options.
+            job (callable): Returns the coroutine doing the work.
+            on_queued (callable, optional): Awaited with the queue position (from 1)
+                when the job has to wait for a free slot.
+
+        Returns:
+            The job's result.
+
+        Raises:
+            SchedulerFullError: The queue is full.
+        """
+        task = self._jobs.get(key)
+        if task is not None:
+            self.coalesced += 1
+            return await asyncio.shield(task)
+
+        position = self._running + self._waiting - self.max_concurrency + 1
+        if position > 0 and self._waiting >= self.max_queue:
+            self.rejected += 1
+            raise SchedulerFullError(f"渲染队列已满：{self._waiting}")
+
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self.submitted += 1
+        self._waiting += 1
+        task = asyncio.ensure_future(self._run(key, job, time.monotonic()))
+        self._jobs[key] = task
+
+        if position > 0 and on_queued is not None:
+            try:
+                await on_queued(position)
+            except Exception as e:  # pylint: disable=broad-except
+                logger.warning("发送排队消息失败：%s", e)
+        # shield: a cancelled caller must not cancel the job shared with others
+        return await asyncio.shield(task)
+
+    async def _run(self, key, job, enqueued_at):
+        try:
+            async with self._semaphore:
+                self._waiting -= 1
+                self._running += 1
+                waited = time.monotonic() - enqueued_at
+                self.wait_total += waited
+                self.wait_max = max(self.wait_max, waited)
+                logger.info(
+                    "渲染任务开始 等待%.2fs 运行中%d 排队中%d",
+                    waited,
+                    self._running,
+                    self._waiting,
+                )
+                try:
+                    result = await job()
+                except Exception:
+                    self.failed += 1
+                    raise
+                finally:
+                    self._running -= 1
+                self.completed += 1
+                return result
+        finally:
+            self._jobs.pop(key, None)
+            logger.info("渲染任务结束 %s", self.stats())
+
+    def stats(self) -> dict:
+        """
+        Scheduler metrics.
+        """
+        started = self.completed + self.failed + self._running
+        return {
+            "running": self._running,
+            "queue_depth": self._waiting,
+            "submitted": self.submitted,
+            "coalesced": self.coalesced,
+            "rejected": self.rejected,
+            "completed": self.completed,
+            "failed": self.failed,
+            "wait_avg": self.wait_total / started if started else 0.0,
+            "wait_max": self.wait_max,
+        }
@@ -2,14 +2,47 @@
 This module contains the SongDrawingBoard class.
 """
 
+import hashlib
 import textwrap
+from pathlib import Path
 
-from PIL import Image, ImageDraw
-from src.assets_generator.get_assets import AssetType
+from PIL import Image
+from src.assets_generator.get_assets import Assets, AssetType
 
 from src.draw.drawing_board import DrawingBoard
+from src.draw.glyph_atlas import GlyphAtlas
+from src.draw.render_cache import RenderedImageCache
+from src.draw.template_pool import CARD_SIZE, RA_BASE_SIZE, TYPE_SIZE, TemplatePool
+from src.utils.app_config import config
 from .data_models.song import SongData
 
+# Bump when the card layout changes so that cached cards are not reused
+CARD_LAYOUT_VERSION = 2
+
+# (size, stroke width) of the numbers on a card, all in en_font
+CARD_NUMBER_STYLES = [(18, 2), (19, 2), (20, 1)]
+
+
+def warm_up_card_glyphs():
+    """
+    Build the glyph atlases of the numbers on a card.
+    """
+    for size, stroke_width in CARD_NUMBER_STYLES:
+        GlyphAtlas.get_instance(config.static_config["en_font"], size, stroke_width)
+
+
+def get_song_card_cache():
+    """
+    Returns the shared cache of finished song cards.
+    """
+    cache_config = config.cache_config
+    spill_dir = None
+    if cache_config.get("card_cache_spill", False):
+        spill_dir = Path(cache_config.get("cache_path", "./static/cache"), "cards")
+    return RenderedImageCache.get_instance(
+        "song_card", cache_config.get("card_cache_size", 256), spill_dir
+    )
+
 
 class SongDrawingBoard(DrawingBoard):
     """
@@ -38,9 +71,65 @@ class SongDrawingBoard(DrawingBoard):
         self.song_data = song_data
         self.is_draw_title = is_draw_title
 
-        super().__init__(main_img_path, resize=(190, 252))
+        super().__init__(
+            main_img_path,
+            main_img=TemplatePool.get_instance().copy(main_img_path, CARD_SIZE),
+        )
+
+    @staticmethod
+    def get_cache_key(song_data: SongData, is_draw_title):
+        """
+        Returns a key that identifies the finished card.
+
+        The card only depends on these song fields, the title flag and the
+        local files resolved for its assets (a placeholder cover resolves to
+        a different path than the real one).
+        """
+        assets = Assets.get_instance()
+        fields = (
+            CARD_LAYOUT_VERSION,
+            song_data.song_id,
+            song_data.level_index,
+            song_data.type,
+            song_data.ds,
+            song_data.rating,
+            song_data.achievements,
+            song_data.fc,
+            song_data.fs,
+            song_data.rating_icon,
+            song_data.title if is_draw_title else None,
+            assets.get_local(AssetType.COVER, song_data.song_id),
+            assets.get_local(AssetType.RANK, song_data.rating_icon)
+            if song_data.rating_icon
+            else None,
+            assets.get_local(AssetType.BADGE, f"{song_data.fc}")
+            if song_data.fc
+            else None,
+            assets.get_local(AssetType.BADGE, f"{song_data.fs}")
+            if song_data.fs
+            else None,
+        )
+        return hashlib.sha1(repr(fields).encode("utf-8")).hexdigest()
 
-    async def draw_song_cover(self, position=(19, 13)):
+    def draw_number(self, img, position, text, font_size, fill, stroke_width):
+        """
+        Draw numeric text with a black stroke from the glyph atlas, falling back
+        to the text bitmap cache for characters outside the atlas.
+
+        Args:
+        - img: The image to draw on.
+        - position: The top-left anchor.
+        - text: The text.
+        - font_size: The font size (en_font).
+        - fill: The text color.
+        - stroke_width: The stroke width.
+        """
+        atlas = GlyphAtlas.get_instance(self.en_font, font_size, stroke_width)
+        if atlas.draw(img, position, text, fill, (0, 0, 0)):
+            return
+        self.draw_text(img, position, text, font_size, fill, stroke_width=stroke_width)
+
+    def draw_song_cover(self, position=(19, 13)):
         """
         Draw the song cover.
 
@@ -48,12 +137,9 @@ class SongDrawingBoard(DrawingBoard):
         - position: The coordinates for drawing the cover. Default is (19, 13).
         """
         # Format the song ID
-        cover_img_path = await self.asstes.get(AssetType.COVER, self.song_data.song_id)
-        cover_img = Image.open(cover_img_path)
-
-        cover_img = cover_img.convert("RGBA")
-        # Resize the cover image
-        cover_img = cover_img.resize((152, 152))
+        cover_img_path = self.asstes.get_local(AssetType.COVER, self.song_data.song_id)
+        # Load the cover image converted to RGBA and resized
+        cover_img = self.image_cache.open(cover_img_path, size=(152, 152), mode="RGBA")
         # Paste the cover image onto the main image
         self.main_img.paste(cover_img, position, cover_img)
 
@@ -68,8 +154,7 @@ class SongDrawingBoard(DrawingBoard):
             f"{self.song_data.type.lower()}.png"
         )
 
-        type_img = Image.open(type_img_path)
-        type_img = type_img.resize((85, 22))
+        type_img = TemplatePool.get_instance().get(type_img_path, TYPE_SIZE)
         self.main_img.paste(type_img, position, type_img)
 
     def draw_song_rank(self, position=(130, 0), font_size=18):
@@ -81,23 +166,14 @@ class SongDrawingBoard(DrawingBoard):
         - font_size: The font size for the rank. Default is 18.
         """
         ra_plate_img_path = self.asstes.generate_assets_path("ra_base.png")
-        ra_plate_img = Image.open(ra_plate_img_path)
-        ra_plate_img = ra_plate_img.resize((60, 32))
-
-        font_ra = self.get_font(font_size)
-        draw_ra_plate = ImageDraw.Draw(ra_plate_img)
-        draw_ra_plate.text(
-            (12, 7),
-            str(self.song_data.rating),
-            font=font_ra,
-            fill=(255, 200, 0),
-            stroke_width=2,
-            stroke_fill=(0, 0, 0),
-            align="center",
+        ra_plate_img = TemplatePool.get_instance().copy(ra_plate_img_path, RA_BASE_SIZE)
+
+        self.draw_number(
+            ra_plate_img, (12, 7), str(self.song_data.rating), font_size, (255, 200, 0), 2
         )
         self.main_img.paste(ra_plate_img, position, ra_plate_img)
 
-    async def draw_song_rate(self, position=(10, 210), target_height=32):
+    def draw_song_rate(self, position=(10, 210), target_height=32):
         """
         Draw the song score.
 
@@ -106,13 +182,15 @@ class SongDrawingBoard(DrawingBoard):
         - target_height: The target height for the score image. Default is 32.
         """
         if self.song_data.rating_icon:
-            rate_img_path = await self.asstes.get(
+            rate_img_path = self.asstes.get_local(
                 AssetType.RANK, self.song_data.rating_icon
             )
-            rate_img = Image.open(rate_img_path)
+            rate_img = self.image_cache.open(rate_img_path)
             aspect_ratio = rate_img.width / rate_img.height
             target_width = int(target_height * aspect_ratio)
-            rate_img = rate_img.resize((target_width, target_height))
+            rate_img = self.image_cache.open(
+                rate_img_path, size=(target_width, target_height)
+            )
             self.main_img.paste(rate_img, position, rate_img)
 
     def draw_song_ds(self, position=(138, 171), font_size=19):
@@ -123,15 +201,8 @@ class SongDrawingBoard(DrawingBoard):
         - position: The coordinates for drawing the difficulty level.
         - font_size: The font size for the difficulty level.
         """
-        draw_base = ImageDraw.Draw(self.main_img)
-        draw_base.text(
-            position,
-            str(self.song_data.ds),
-            font=self.get_font(font_size),
-            fill=(255, 255, 255),
-            stroke_width=2,
-            stroke_fill=(0, 0, 0),
-            align="center",
+        self.draw_number(
+            self.main_img, position, str(self.song_data.ds), font_size, (255, 255, 255), 2
         )
 
     def draw_song_achievement(self, position=(75, 215), font_size=20):
@@ -143,15 +214,13 @@ class SongDrawingBoard(DrawingBoard):
         - font_size: The font size for the achievement. Default is 20.
         """
         if self.song_data.achievements:
-            draw_base = ImageDraw.Draw(self.main_img)
-            draw_base.text(
+            self.draw_number(
+                self.main_img,
                 position,
                 f"{self.song_data.achievements:.4f}",
-                font=self.get_font(font_size),
-                fill=(255, 255, 255),
-                stroke_width=1,
-                stroke_fill=(0, 0, 0),
-                align="center",
+                font_size,
+                (255, 255, 255),
+                1,
             )
 
     def draw_song_title(self, position=(20, 25), font_size=16):
@@ -165,17 +234,11 @@ class SongDrawingBoard(DrawingBoard):
         wrapped_text = textwrap.fill(
             str(self.song_data.title), width=11, break_long_words=True
         )
-        draw_base = ImageDraw.Draw(self.main_img)
-        draw_base.text(
-            position,
-            wrapped_text,
-            font=self.get_font(font_size),
-            fill=(255, 255, 255),
-            stroke_width=2,
-            stroke_fill=(0, 0, 0),
+        self.draw_text(
+            self.main_img, position, wrapped_text, font_size, (255, 255, 255), stroke_width=2
         )
 
-    async def draw_song_badge(self, position=(135, 125)):
+    def draw_song_badge(self, position=(135, 125)):
         """
         Draw the song badges.
 
@@ -185,32 +248,30 @@ class SongDrawingBoard(DrawingBoard):
         x, y = position
 
         if self.song_data.fc:
-            fc_img_path = await self.asstes.get(AssetType.BADGE, f"{self.song_data.fc}")
-            fc_img = Image.open(fc_img_path)
-            fc_img = fc_img.resize(
-                (35, 35), resample=Image.Resampling.NEAREST
-            )  # Using BILINEAR filter here
+            fc_img_path = self.asstes.get_local(AssetType.BADGE, f"{self.song_data.fc}")
+            fc_img = self.image_cache.open(
+                fc_img_path, size=(35, 35), resample=Image.Resampling.NEAREST
+            )
             self.paste(fc_img, (x, y))
             x -= 35
 
         if self.song_data.fs:
-            fs_img_path = await self.asstes.get(AssetType.BADGE, f"{self.song_data.fs}")
-            fs_img = Image.open(fs_img_path)
-            fs_img = fs_img.resize(
-                (35, 35), resample=Image.Resampling.NEAREST
-            )  # Using BILINEAR filter here
+            fs_img_path = self.asstes.get_local(AssetType.BADGE, f"{self.song_data.fs}")
+            fs_img = self.image_cache.open(
+                fs_img_path, size=(35, 35), resample=Image.Resampling.NEAREST
+            )
             self.paste(fs_img, (x, y))
 
-    async def draw(self):
+    def draw(self):
         """
-        Draw the song card.
+        Draw the song card. Assets must already be available locally.
 
         Args:
         - is_draw_title: Whether to draw the song title. Default is False.
         """
 
         # Draw the song cover
-        await self.draw_song_cover()
+        self.draw_song_cover()
 
         # Draw the song type
         self.draw_song_type()
@@ -222,14 +283,14 @@ class SongDrawingBoard(DrawingBoard):
         self.draw_song_ds()
 
         # Draw the song rating
-        await self.draw_song_rate()
+        self.draw_song_rate()
 
         if self.is_draw_title:
             # Draw the song title
             self.draw_song_title()
 
         # Draw the song badges
-        await self.draw_song_badge()
+        self.draw_song_badge()
 
         # Draw the song achievement
         self.draw_song_achievement()
@@ -0,0 +1,107 @@
+"""
+This module keeps the pre-resized templates every song card is built from.
+"""
+
+import threading
+
+from botpy import logger
+from PIL import Image
+
+from src.assets_generator.get_assets import Assets
+
+CARD_SIZE = (190, 252)
+RA_BASE_SIZE = (60, 32)
+TYPE_SIZE = (85, 22)
+
+
+def get_card_templates():
+    """
+    Returns the (path, size) of every card template.
+    """
+    assets = Assets.get_instance()
+    templates = [
+        (assets.generate_assets_path("base", f"{level_index}{color}.png"), CARD_SIZE)
+        for level_index in range(5)
+        for color in ("", "_r", "_g")
+    ]
+    templates.append((assets.generate_assets_path("ra_base.png"), RA_BASE_SIZE))
+    templates += [
+        (assets.generate_assets_path(f"{song_type}.png"), TYPE_SIZE)
+        for song_type in ("dx", "sd")
+    ]
+    return templates
+
+
+class TemplatePool:
+    """
+    Decodes and resizes each card template once and keeps it for the life of
+    the process. Unlike the image cache, templates are never evicted.
+
+    Templates are shared: use copy() to get one to draw on.
+    """
+
+    _instance = None
+
+    @classmethod
+    def get_instance(cls):
+        """
+        Get the singleton instance.
+        """
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def __init__(self) -> None:
+        """
+        Initialize the pool.
+        """
+        if TemplatePool._instance is not None:
+            raise Exception("这是一个单例类，请使用 get_instance() 获取实例")
+        self._templates = {}
+        self._lock = threading.Lock()
+        TemplatePool._instance = self
+
+    def get(self, path, size):
+        """
+        Get a template.
+
+        Args:
+            path (str): The template image path.
+            size (tuple): The template size.
+
+        Returns:
+            PIL.Image.Image: The shared template. Do not draw on it.
+        """
+        key = (str(path), tuple(size))
+        template = self._templates.get(key)
+        if template is None:
+            template = Image.open(path)
+            template.load()
+            if template.size != key[1]:
+                template = template.resize(key[1])
+            with self._lock:
+                template = self._templates.setdefault(key, template)
+        return template
+
+    def copy(self, path, size):
+        """
+        Get a copy of a template to draw on.
+
+        Args:
+            path (str): The template image path.
+            size (tuple): The template size.
+
+        Returns:
+            PIL.Image.Image: The copy.
+        """
+        return self.get(path, size).copy()
+
+    def warm_up(self):
+        """
+        Load every card template.
+        """
+        for path, size in get_card_templates():
+            try:
+                self.get(path, size)
+            except OSError as e:
+                logger.warning("预加载模板失败：%s %s", path, e)
@@ -7,6 +7,13 @@ import os
 import yaml
 from botpy import logger
 from src.assets_generator.get_assets import Assets
+from src.common.alias import AliasIndex
+from src.common.song_catalog import SongCatalog
+from src.utils.avatar_store import AvatarStore
+from src.utils.font_registry import FontRegistry
+from src.utils.http_client import HttpClient
+from src.utils.image_cache import ImageCache
+from src.utils.text_cache import TextBitmapCache
 
 
 class AppConfig:
@@ -28,6 +35,9 @@ class AppConfig:
         self.qmsg_key = None
         self.bot_config = None
         self.static_config = None
+        self.http_config = None
+        self.cache_config = {}
+        self.render_config = {}
         self.database_url = None
         self.debug = False
         self.loaded = False
@@ -48,6 +58,9 @@ class AppConfig:
                     self.heartbeat_url = conf.get("heartbeat_url", "")
                     self.bot_config = conf.get("bot_config", {})
                     self.static_config = conf.get("static_config", {})
+                    self.http_config = conf.get("http_config", {})
+                    self.cache_config = conf.get("cache_config", {})
+                    self.render_config = conf.get("render_config", {})
                     self.database_url = conf.get("database_url", "")
                     self.qmsg_key = conf.get("qmsg_key", "")
                     self.debug = conf.get("debug", False)
@@ -86,6 +99,40 @@ def create_config_file(config_path):
                 "jp_font": "CusterMagic-Regular.ttf",
                 "mix_font": "happy.ttf",
             },
+            "http_config": {
+                "limit": 100,
+                "limit_per_host": 10,
+                "ttl_dns_cache": 300,
+                "total_timeout": 60,
+                "connect_timeout": 10,
+            },
+            "cache_config": {
+                "cache_path": "./static/cache",
+                "song_list_ttl": 3600,
+                "alias_list_ttl": 3600,
+                "missing_asset_ttl": 604800,
+                "image_cache_mb": 128,
+                "text_cache_mb": 16,
+                "avatar_ttl": 86400,
+                "card_cache_size": 256,
+                "card_cache_spill": False,
+                "profile_cache_size": 64,
+                "profile_cache_spill": False,
+                "output_cache_mb": 256,
+                "board_cache_mb": 1024,
+            },
+            "render_config": {
+                "prefetch_concurrency": 16,
+                "workers": 2,
+                "incremental": True,
+                "max_concurrency": 4,
+                "max_queue": 32,
+                "seed_mode": "daily",
+                "seed": 0,
+                "output_format": "png_quant",
+                "output_quality": 80,
+                "output_max_kb": 0,
+            },
             "database_url": "",
             "qmsg_key": "",
             "debug": False,
@@ -116,4 +163,27 @@ def app_init(config_path="config.yaml"):
 # 创建配置实例
 config = AppConfig()
 app_init()
-Assets.get_instance(config.base_url, config.static_config["assets_path"], config.proxy)
+Assets.get_instance(
+    config.base_url,
+    config.static_config["assets_path"],
+    config.proxy,
+    config.cache_config.get("missing_asset_ttl", 7 * 24 * 3600),
+)
+HttpClient.get_instance(**(config.http_config or {}))
+SongCatalog.get_instance(
+    config.cache_config.get("cache_path", "./static/cache"),
+    config.cache_config.get("song_list_ttl", 3600),
+    config.proxy,
+)
+AliasIndex.get_instance(
+    config.cache_config.get("cache_path", "./static/cache"),
+    config.cache_config.get("alias_list_ttl", 3600),
+    config.proxy,
+)
+ImageCache.get_instance(config.cache_config.get("image_cache_mb", 128) * 1024 * 1024)
+FontRegistry.get_instance(config.static_config["font_path"])
+AvatarStore.get_instance(
+    os.path.join(config.cache_config.get("cache_path", "./static/cache"), "avatars"),
+    config.cache_config.get("avatar_ttl", 86400),
+)
+TextBitmapCache.get_instance(config.cache_config.get("text_cache_mb", 16) * 1024 * 1024)
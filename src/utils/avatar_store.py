@@ -0,0 +1,193 @@
+"""
+avatar_store.py - 处理后头像的本地缓存。
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+from io import BytesIO
+from pathlib import Path
+
+import aiohttp
+from botpy import logger
+from PIL import Image
+
+from src.utils.http_client import HttpClient
+from src.utils.image_utils import image_to_bytes, round_avatar
+
+
+class AvatarStore:
+    """
+    以头像 URL 为键保存处理完成(185x185 圆角 RGBA)的头像 PNG。
+
+    已有缓存时直接返回，不等待网络；过期(ttl)后在后台通过
+    ETag / If-Modified-Since 发起条件请求，头像变化时才重新下载和处理。
+    """
+
+    _instance = None
+
+    @classmethod
+    def get_instance(cls, cache_dir: str = None, ttl: float = 86400):
+        """
+        获取单例实例
+        """
+        if cls._instance is None:
+            if cache_dir is None:
+                raise ValueError("需要cache_dir来初始化")
+            cls._instance = cls(cache_dir, ttl)
+        return cls._instance
+
+    def __init__(self, cache_dir: str, ttl: float = 86400) -> None:
+        """
+        初始化
+
+        Args:
+            cache_dir (str): 头像缓存目录。
+            ttl (float): 头像多久后重新验证(秒)。
+        """
+        if AvatarStore._instance is not None:
+            raise Exception("这是一个单例类，请使用 get_instance() 获取实例")
+        self.cache_dir = Path(cache_dir)
+        self.ttl = ttl
+        self._inflight = {}
+        self._background_tasks = set()
+        AvatarStore._instance = self
+
+    def _paths(self, url: str):
+        name = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        return self.cache_dir / f"{name}.png", self.cache_dir / f"{name}.json"
+
+    def _load_meta(self, meta_path: Path) -> dict:
+        try:
+            with open(meta_path, "r", encoding="utf-8") as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return {}
+
+    async def get(self, url: str):
+        """
+        获取处理后的头像
+
+        Args:
+            url (str): 头像 URL。
+
+        Returns:
+            bytes: 处理后的头像(PNG)，获取失败时返回 None。
+        """
+        png_path, meta_path = self._paths(url)
+        try:
+            data = png_path.read_bytes()
+        except OSError:
+            data = None
+
+        if data is not None:
+            meta = self._load_meta(meta_path)
+            if time.time() - meta.get("fetched_at", 0) >= self.ttl:
+                # 先使用旧头像，在后台重新验证
+                self._start_refresh(url)
+            return data
+        return await self._refresh(url)
+
+    def get_version(self, url: str):
+        """
+        获取已保存头像的版本，不发起网络请求
+
+        Args:
+            url (str): 头像 URL。
+
+        Returns:
+            str: 头像的 ETag 或 Last-Modified，服务器都未提供时为文件修改时间；
+                没有保存该头像时返回 None。
+        """
+        png_path, meta_path = self._paths(url)
+        try:
+            mtime = png_path.stat().st_mtime_ns
+        except OSError:
+            return None
+        meta = self._load_meta(meta_path)
+        return meta.get("etag") or meta.get("last_modified") or str(mtime)
+
+    def _start_refresh(self, url: str):
+        if url in self._inflight:
+            return
+        task = asyncio.ensure_future(self._refresh(url))
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+    async def _refresh(self, url: str):
+        # 同一头像同时只发起一次请求
+        task = self._inflight.get(url)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch(url))
+            self._inflight[url] = task
+            task.add_done_callback(lambda _: self._inflight.pop(url, None))
+        return await asyncio.shield(task)
+
+    async def _fetch(self, url: str):
+        png_path, meta_path = self._paths(url)
+        meta = self._load_meta(meta_path) if png_path.exists() else {}
+        headers = {}
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+
+        try:
+            async with HttpClient.get_instance().get(url, headers=headers) as resp:
+                if resp.status == 304:
+                    meta["fetched_at"] = time.time()
+                    self._save(meta_path, json.dumps(meta).encode("utf-8"))
+                    return png_path.read_bytes()
+                if resp.status != 200:
+                    logger.warning("获取头像失败：%s %s", url, resp.status)
+                    return self._read_stale(png_path)
+                raw = await resp.read()
+                meta = {
+                    "etag": resp.headers.get("ETag"),
+                    "last_modified": resp.headers.get("Last-Modified"),
+                    "fetched_at": time.time(),
+                }
+        except (aiohttp.ClientError, asyncio.TimeoutError, OSError) as e:
+            logger.warning("获取头像失败：%s %s", url, e)
+            return self._read_stale(png_path)
+
+        loop = asyncio.get_running_loop()
+        try:
+            data = await loop.run_in_executor(None, self.process, raw)
+        except (OSError, ValueError) as e:
+            logger.warning("处理头像失败：%s %s", url, e)
+            return self._read_stale(png_path)
+        self._save(png_path, data)
+        self._save(meta_path, json.dumps(meta).encode("utf-8"))
+        return data
+
+    @staticmethod
+    def process(raw: bytes) -> bytes:
+        """
+        将下载的头像处理为 185x185 圆角 PNG
+
+        Args:
+            raw (bytes): 下载的头像数据。
+
+        Returns:
+            bytes: 处理后的头像(PNG)。
+        """
+        return image_to_bytes(round_avatar(Image.open(BytesIO(raw))))
+
+    @staticmethod
+    def _read_stale(png_path: Path):
+        try:
+            return png_path.read_bytes()
+        except OSError:
+            return None
+
+    def _save(self, path: Path, content: bytes):
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = path.with_name(f"{path.name}.tmp")
+            temp_path.write_bytes(content)
+            os.replace(temp_path, path)
+        except OSError as e:
+            logger.warning("保存头像缓存失败：%s %s", path, e)
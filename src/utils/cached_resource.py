@@ -0,0 +1,145 @@
+"""
+cached_resource.py - 带磁盘持久化和条件请求的 JSON 资源缓存。
+"""
+
+import asyncio
+import json
+import os
+import time
+from pathlib import Path
+
+import aiohttp
+from botpy import logger
+
+from src.utils.http_client import HttpClient
+
+
+class CachedJsonResource:
+    """
+    远程 JSON 资源的本地副本。
+
+    数据会持久化到磁盘，重启后直接从磁盘加载；过期(ttl)后通过
+    ETag / If-Modified-Since 发起条件请求，只有内容变化时才重新下载。
+    """
+
+    # 请求失败后多久再重试(秒)，避免上游故障时每次调用都等待超时
+    RETRY_INTERVAL = 60
+
+    def __init__(
+        self, url: str, cache_file: str, ttl: float = 3600, proxy: str = None
+    ) -> None:
+        """
+        初始化
+
+        Args:
+            url (str): 资源地址。
+            cache_file (str): 本地缓存文件路径。
+            ttl (float): 缓存有效期(秒)。
+            proxy (str): 请求使用的代理，为空时直连。
+        """
+        self.url = url
+        self.cache_file = Path(cache_file)
+        self.ttl = ttl
+        self.proxy = proxy or None
+        self.data = None
+        self.etag = None
+        self.last_modified = None
+        self.fetched_at = 0.0
+        self._lock = asyncio.Lock()
+
+    @property
+    def is_stale(self) -> bool:
+        """
+        缓存是否已过期
+        """
+        return time.time() - self.fetched_at >= self.ttl
+
+    def load_from_disk(self) -> bool:
+        """
+        从磁盘加载缓存
+
+        Returns:
+            bool: 是否成功加载。
+        """
+        if not self.cache_file.exists():
+            return False
+        try:
+            with open(self.cache_file, "r", encoding="utf-8") as file:
+                cached = json.load(file)
+        except (OSError, ValueError) as e:
+            logger.warning("读取缓存失败：%s %s", self.cache_file, e)
+            return False
+        self.data = cached.get("data")
+        self.etag = cached.get("etag")
+        self.last_modified = cached.get("last_modified")
+        self.fetched_at = cached.get("fetched_at", 0.0)
+        return self.data is not None
+
+    def save_to_disk(self):
+        """
+        将缓存写入磁盘(先写临时文件再替换，避免写一半被读取)
+        """
+        self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+        temp_file = self.cache_file.with_name(f"{self.cache_file.name}.tmp")
+        with open(temp_file, "w", encoding="utf-8") as file:
+            json.dump(
+                {
+                    "url": self.url,
+                    "etag": self.etag,
+                    "last_modified": self.last_modified,
+                    "fetched_at": self.fetched_at,
+                    "data": self.data,
+                },
+                file,
+                ensure_ascii=False,
+            )
+        os.replace(temp_file, self.cache_file)
+
+    async def refresh(self, force: bool = False) -> bool:
+        """
+        在缓存过期时刷新数据。
+
+        Args:
+            force (bool): 是否忽略有效期强制发起请求。
+
+        Returns:
+            bool: 数据是否发生了变化。
+        """
+        async with self._lock:
+            if not force and not self.is_stale:
+                return False
+
+            headers = {}
+            if self.data is not None:
+                if self.etag:
+                    headers["If-None-Match"] = self.etag
+                if self.last_modified:
+                    headers["If-Modified-Since"] = self.last_modified
+
+            try:
+                async with HttpClient.get_instance().get(
+                    self.url, headers=headers, proxy=self.proxy
+                ) as resp:
+                    if resp.status == 304:
+                        self.fetched_at = time.time()
+                        self.save_to_disk()
+                        return False
+                    if resp.status != 200:
+                        logger.warning("获取 %s 失败：%s", self.url, resp.status)
+                        self._delay_retry()
+                        return False
+                    self.data = await resp.json()
+                    self.etag = resp.headers.get("ETag")
+                    self.last_modified = resp.headers.get("Last-Modified")
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+                logger.warning("获取 %s 失败：%s", self.url, e)
+                self._delay_retry()
+                return False
+
+            self.fetched_at = time.time()
+            self.save_to_disk()
+            logger.info("已更新缓存：%s", self.url)
+            return True
+
+    def _delay_retry(self):
+        self.fetched_at = time.time() - self.ttl + self.RETRY_INTERVAL
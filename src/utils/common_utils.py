@@ -9,6 +9,8 @@ from io import BytesIO
 import aiohttp
 from PIL import Image
 
+from src.utils.http_client import HttpClient
+
 
 def has_only_common_characters(input_str):
     """
@@ -25,12 +27,13 @@ def has_only_common_characters(input_str):
     return bool(pattern.match(input_str))
 
 
-def generate_boolean_with_probability(probability):
+def generate_boolean_with_probability(probability, rng=random):
     """
     根据给定的概率生成布尔值。
 
     Args:
         probability (int): 期望的概率，范围为1-100。
+        rng (random.Random, optional): 随机数生成器。
 
     Returns:
         bool: 根据概率生成的布尔值。
@@ -38,7 +41,7 @@ def generate_boolean_with_probability(probability):
     # 确保概率在合法范围内
     probability = max(0, min(100, probability))
     # 生成一个在1到100之间的随机数
-    random_number = random.randint(1, 100)
+    random_number = rng.randint(1, 100)
     # 如果随机数小于等于概率，返回True；否则返回False
     return random_number <= probability
 
@@ -55,11 +58,10 @@ async def fetch_image(source):
     """
     if source.startswith("http"):
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(source) as response:
-                    if response.status == 200:
-                        image_data = await response.read()
-                        return Image.open(BytesIO(image_data))
+            async with HttpClient.get_instance().get(source) as response:
+                if response.status == 200:
+                    image_data = await response.read()
+                    return Image.open(BytesIO(image_data))
         except aiohttp.ClientError as e:
             print(f"An error occurred: {e}")
 
@@ -0,0 +1,81 @@
+"""
+font_registry.py - 进程级字体缓存。
+"""
+
+import threading
+from pathlib import Path
+
+from PIL import ImageFont
+
+
+class FontRegistry:
+    """
+    以 (字体文件, 字号) 为键缓存 FreeType 字体对象，避免每次绘制文字都重新加载字体文件。
+    """
+
+    _instance = None
+
+    @classmethod
+    def get_instance(cls, font_path: str = None):
+        """
+        获取单例实例
+        """
+        if cls._instance is None:
+            if font_path is None:
+                raise ValueError("需要font_path来初始化")
+            cls._instance = cls(font_path)
+        return cls._instance
+
+    def __init__(self, font_path: str) -> None:
+        """
+        初始化
+
+        Args:
+            font_path (str): 字体目录。
+        """
+        if FontRegistry._instance is not None:
+            raise Exception("这是一个单例类，请使用 get_instance() 获取实例")
+        self.font_path = font_path
+        self.load_count = 0
+        self.hits = 0
+        self._fonts = {}
+        self._lock = threading.Lock()
+        FontRegistry._instance = self
+
+    def get(self, font: str, size: int):
+        """
+        获取字体
+
+        Args:
+            font (str): 字体文件名。
+            size (int): 字号。
+
+        Returns:
+            PIL.ImageFont.FreeTypeFont: 字体对象。
+        """
+        key = (font, size)
+        with self._lock:
+            font_obj = self._fonts.get(key)
+            if font_obj is not None:
+                self.hits += 1
+                return font_obj
+            font_obj = ImageFont.truetype(str(Path(self.font_path, font)), size=size)
+            self.load_count += 1
+            self._fonts[key] = font_obj
+            return font_obj
+
+    def preload(self, fonts):
+        """
+        预加载字体
+
+        Args:
+            fonts (iterable): (字体文件名, 字号) 的集合。
+        """
+        for font, size in fonts:
+            self.get(font, size)
+
+    def stats(self) -> dict:
+        """
+        缓存统计信息
+        """
+        return {"fonts": len(self._fonts), "loads": self.load_count, "hits": self.hits}
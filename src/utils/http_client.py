@@ -0,0 +1,112 @@
+"""
+http_client.py - 全局共享的 HTTP 客户端。
+"""
+
+import aiohttp
+from botpy import logger
+
+
+class HttpClient:
+    """
+    长连接复用的 aiohttp 客户端，所有对外请求都应通过它发出。
+    """
+
+    _instance = None
+
+    @classmethod
+    def get_instance(cls, **options):
+        """
+        获取单例实例
+        """
+        if cls._instance is None:
+            cls._instance = cls(**options)
+        return cls._instance
+
+    def __init__(
+        self,
+        limit: int = 100,
+        limit_per_host: int = 10,
+        ttl_dns_cache: int = 300,
+        total_timeout: float = 60,
+        connect_timeout: float = 10,
+    ) -> None:
+        """
+        初始化
+
+        Args:
+            limit (int): 连接池总连接数上限。
+            limit_per_host (int): 每个主机的连接数上限。
+            ttl_dns_cache (int): DNS 缓存时间(秒)。
+            total_timeout (float): 单个请求的总超时时间(秒)。
+            connect_timeout (float): 建立连接的超时时间(秒)。
+        """
+        if HttpClient._instance is not None:
+            raise Exception("这是一个单例类，请使用 get_instance() 获取实例")
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.ttl_dns_cache = ttl_dns_cache
+        self.timeout = aiohttp.ClientTimeout(
+            total=total_timeout, connect=connect_timeout
+        )
+        self._session = None
+        HttpClient._instance = self
+
+    async def start(self):
+        """
+        创建连接池，重复调用不会重复创建。
+        """
+        if self._session is not None and not self._session.closed:
+            return
+        self._session = self._create_session()
+        logger.info(
+            "HTTP 连接池已启动 limit=%s limit_per_host=%s",
+            self.limit,
+            self.limit_per_host,
+        )
+
+    async def close(self):
+        """
+        关闭连接池
+        """
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+            logger.info("HTTP 连接池已关闭")
+        self._session = None
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """
+        获取共享的会话，未启动时(如脚本直接调用)会自动创建。
+        """
+        if self._session is None or self._session.closed:
+            self._session = self._create_session()
+        return self._session
+
+    def _create_session(self) -> aiohttp.ClientSession:
+        connector = aiohttp.TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            ttl_dns_cache=self.ttl_dns_cache,
+        )
+        return aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+
+    def request(self, method: str, url: str, **kwargs):
+        """
+        发起请求，默认不使用代理，需要代理时显式传入 proxy。
+
+        Returns:
+            aiohttp 的请求上下文管理器，用法与 session.request 相同。
+        """
+        return self.session.request(method, url, **kwargs)
+
+    def get(self, url: str, **kwargs):
+        """
+        GET 请求
+        """
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs):
+        """
+        POST 请求
+        """
+        return self.request("POST", url, **kwargs)
@@ -0,0 +1,116 @@
+"""
+image_cache.py - 已解码图片的 LRU 缓存。
+"""
+
+import threading
+from collections import OrderedDict
+
+from PIL import Image
+
+
+class ImageCache:
+    """
+    以 (路径, 尺寸, 模式, 缩放算法) 为键缓存解码并缩放后的 PIL 图片，按内存占用淘汰。
+
+    缓存中的图片是共享的，只读使用(如作为 paste 的来源)时可以直接使用；
+    需要在图片上绘制时请传入 copy=True 获取副本。
+    """
+
+    _instance = None
+
+    @classmethod
+    def get_instance(cls, max_bytes: int = 128 * 1024 * 1024):
+        """
+        获取单例实例
+        """
+        if cls._instance is None:
+            cls._instance = cls(max_bytes)
+        return cls._instance
+
+    def __init__(self, max_bytes: int = 128 * 1024 * 1024) -> None:
+        """
+        初始化
+
+        Args:
+            max_bytes (int): 缓存图片占用内存的上限(字节)。
+        """
+        if ImageCache._instance is not None:
+            raise Exception("这是一个单例类，请使用 get_instance() 获取实例")
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._images = OrderedDict()
+        self._lock = threading.Lock()
+        ImageCache._instance = self
+
+    def open(self, path, size=None, mode=None, resample=None, copy=False):
+        """
+        打开图片
+
+        Args:
+            path (str): 图片路径。
+            size (tuple, optional): 缩放后的尺寸。
+            mode (str, optional): 转换后的模式，如 "RGBA"。
+            resample (int, optional): 缩放算法，默认与 Image.resize 相同。
+            copy (bool, optional): 是否返回可修改的副本。
+
+        Returns:
+            PIL.Image.Image: 图片对象。
+        """
+        key = (str(path), size, mode, resample)
+        with self._lock:
+            img = self._images.get(key)
+            if img is not None:
+                self._images.move_to_end(key)
+                self.hits += 1
+        if img is None:
+            img = self._load(path, size, mode, resample)
+            with self._lock:
+                self.misses += 1
+                if key not in self._images:
+                    self._images[key] = img
+                    self.current_bytes += self._cost(img)
+                    self._evict()
+        return img.copy() if copy else img
+
+    @staticmethod
+    def _load(path, size, mode, resample):
+        img = Image.open(path)
+        img.load()
+        if mode is not None and img.mode != mode:
+            img = img.convert(mode)
+        if size is not None and img.size != tuple(size):
+            if resample is None:
+                img = img.resize(size)
+            else:
+                img = img.resize(size, resample=resample)
+        return img
+
+    @staticmethod
+    def _cost(img) -> int:
+        return img.width * img.height * len(img.getbands())
+
+    def _evict(self):
+        while self.current_bytes > self.max_bytes and len(self._images) > 1:
+            _, img = self._images.popitem(last=False)
+            self.current_bytes -= self._cost(img)
+
+    def clear(self):
+        """
+        清空缓存
+        """
+        with self._lock:
+            self._images.clear()
+            self.current_bytes = 0
+
+    def stats(self) -> dict:
+        """
+        缓存统计信息
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "items": len(self._images),
+            "bytes": self.current_bytes,
+        }
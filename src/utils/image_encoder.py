@@ -0,0 +1,146 @@
+"""
+image_encoder.py - 进程内图片编码。
+"""
+
+import time
+from collections import namedtuple
+from io import BytesIO
+
+from botpy import logger
+from PIL import Image
+
+from src.utils.app_config import config
+
+# 编码结果。ratio 为相对未压缩像素数据的压缩比(百分比)
+EncodedImage = namedtuple(
+    "EncodedImage", ["data", "format", "extension", "quality", "elapsed", "ratio"]
+)
+
+# 后端 -> (PIL 格式, 文件扩展名)
+BACKENDS = {
+    "png_quant": ("PNG", "png"),
+    "png": ("PNG", "png"),
+    "webp": ("WEBP", "webp"),
+    "jpeg": ("JPEG", "jpg"),
+}
+
+# 超出体积预算时每次降低的质量，以及允许的最低质量
+QUALITY_STEP = 15
+MIN_QUALITY = 20
+# 降低质量仍超出预算时的缩放比例与最多缩放次数
+SCALE_STEP = 0.8
+MAX_SCALE_STEPS = 3
+
+
+class ImageEncoder:
+    """
+    将 PIL 图片直接编码为字节，不经过临时文件和外部进程。
+
+    后端:
+        png_quant: 调色板量化后的 PNG，quality 决定调色板颜色数。
+        png: 无损 PNG。
+        webp / jpeg: 有损编码，quality 即编码质量。
+    """
+
+    def __init__(self, backend: str = "png_quant", quality: int = 80, max_bytes: int = 0):
+        """
+        初始化
+
+        Args:
+            backend (str): 编码后端，见 BACKENDS。
+            quality (int): 编码质量，1-100。
+            max_bytes (int): 体积预算(字节)，0 表示不限制。无损 png 后端只能靠缩放满足预算。
+        """
+        if backend not in BACKENDS:
+            raise ValueError(f"不支持的编码后端: {backend}")
+        self.backend = backend
+        self.quality = max(1, min(100, int(quality)))
+        self.max_bytes = max_bytes
+
+    @property
+    def extension(self) -> str:
+        """
+        编码结果的文件扩展名
+        """
+        return BACKENDS[self.backend][1]
+
+    def encode(self, img) -> EncodedImage:
+        """
+        编码图片，超出体积预算时先降低质量，再缩小尺寸。
+
+        Args:
+            img (PIL.Image.Image): 图片对象。
+
+        Returns:
+            EncodedImage: 编码结果。
+        """
+        start = time.perf_counter()
+        raw_size = img.width * img.height * len(img.getbands())
+        quality = self.quality
+        data = self._encode(img, quality)
+
+        if self.max_bytes and len(data) > self.max_bytes:
+            lossy = self.backend != "png"
+            while lossy and len(data) > self.max_bytes and quality > MIN_QUALITY:
+                quality = max(MIN_QUALITY, quality - QUALITY_STEP)
+                data = self._encode(img, quality)
+            scaled = img
+            for _ in range(MAX_SCALE_STEPS):
+                if len(data) <= self.max_bytes:
+                    break
+                scaled = scaled.resize(
+                    (int(scaled.width * SCALE_STEP), int(scaled.height * SCALE_STEP)),
+                    Image.LANCZOS,
+                )
+                data = self._encode(scaled, quality)
+            if len(data) > self.max_bytes:
+                logger.warning(
+                    "图片编码后仍超出体积预算：%d > %d", len(data), self.max_bytes
+                )
+
+        elapsed = time.perf_counter() - start
+        ratio = (1 - len(data) / raw_size) * 100 if raw_size else 0.0
+        return EncodedImage(
+            data, BACKENDS[self.backend][0], self.extension, quality, elapsed, ratio
+        )
+
+    def _encode(self, img, quality: int) -> bytes:
+        buffer = BytesIO()
+        if self.backend == "png_quant":
+            colors = max(2, min(256, round(256 * quality / 100)))
+            # RGBA 图片只能使用 FASTOCTREE 量化
+            method = Image.FASTOCTREE if img.mode == "RGBA" else Image.MEDIANCUT
+            if img.mode not in ("RGB", "RGBA"):
+                img = img.convert("RGBA")
+            img.quantize(colors=colors, method=method).save(
+                buffer, format="PNG", optimize=True
+            )
+        elif self.backend == "png":
+            img.save(buffer, format="PNG", optimize=True)
+        elif self.backend == "webp":
+            img.save(buffer, format="WEBP", quality=quality, method=4)
+        else:
+            if img.mode != "RGB":
+                img = img.convert("RGB")
+            img.save(buffer, format="JPEG", quality=quality, optimize=True)
+        return buffer.getvalue()
+
+
+def get_output_encoder(is_use_origin: bool = False) -> ImageEncoder:
+    """
+    按配置创建 b50 图片的编码器
+
+    Args:
+        is_use_origin (bool): 是否输出无损原图。
+
+    Returns:
+        ImageEncoder: 编码器。
+    """
+    render_config = config.render_config
+    if is_use_origin:
+        return ImageEncoder("png")
+    return ImageEncoder(
+        render_config.get("output_format", "png_quant"),
+        render_config.get("output_quality", 80),
+        render_config.get("output_max_kb", 0) * 1024,
+    )
@@ -2,176 +2,168 @@
 图片处理工具。
 """
 
-import asyncio
-import os
-import subprocess
-import aiohttp
+from functools import lru_cache
 
 from PIL import Image, ImageDraw
 from io import BytesIO
 
 
-def draw_rainbow_text(img, position, text, font, gradient_file):
+@lru_cache(maxsize=4)
+def load_gradient(gradient_file):
     """
-    在图片上绘制彩虹渐变文字。
+    解码渐变颜色效果图片，每个文件只解码一次。
+
+    Args:
+        gradient_file (str): 渐变颜色效果图片路径。
+
+    Returns:
+        PIL.Image.Image: 共享的图片对象，不要在其上绘制。
+    """
+    gradient_im = Image.open(gradient_file)
+    gradient_im.load()
+    return gradient_im
+
+
+@lru_cache(maxsize=64)
+def get_gradient(gradient_file, size):
+    """
+    获取缩放到指定尺寸的渐变图片，按尺寸缓存。
+
+    Args:
+        gradient_file (str): 渐变颜色效果图片路径。
+        size (tuple): 目标尺寸。
+
+    Returns:
+        PIL.Image.Image: 共享的图片对象，不要在其上绘制。
+    """
+    return load_gradient(gradient_file).resize(size)
+
+
+@lru_cache(maxsize=128)
+def render_rainbow_text(text, font, gradient_file):
+    """
+    生成彩虹渐变文字图片，按 (文字, 字体, 渐变图片) 缓存。
+
+    字体对象来自 FontRegistry，同一字体文件和字号总是同一个对象。
 
     Args:
-        img (PIL.Image.Image): 图片对象。
-        position (tuple): 文字位置，格式为 (x, y)。
         text (str): 文字内容。
         font (PIL.ImageFont.FreeTypeFont): 字体对象。
         gradient_file (str): 渐变颜色效果图片路径。
+
+    Returns:
+        PIL.Image.Image: 共享的 RGBA 图片，只用作 paste 的来源。
     """
-    word = text
-    word_position = position
     # 文字区域的box坐标
-    word_box = font.getbbox(word)
-    # 渐变颜色效果图片
-    # font_gradient_file_path = os.path.join(
-    #     static_config["assets_path"], "img", "gradient.png"
-    # )
-    font_gradient_file_path = gradient_file
+    word_box = font.getbbox(text)
+    size = (word_box[2] - word_box[0], word_box[3] - word_box[1])
     # 生成文字区域的alpha图片
-    font_gradient_im = Image.open(font_gradient_file_path)
-    font_gradient_im = font_gradient_im.resize(
-        (word_box[2] - word_box[0], word_box[3] - word_box[1])
-    )
+    font_gradient_im = get_gradient(gradient_file, size).copy()
     font_alpha = Image.new("L", font_gradient_im.size)
     font_alpha_d = ImageDraw.Draw(font_alpha)
-    font_alpha_d.text((0, 0), word, fill="White", anchor="lt", font=font)
+    font_alpha_d.text((0, 0), text, fill="White", anchor="lt", font=font)
     font_gradient_im.putalpha(font_alpha)
+    return font_gradient_im
 
-    img.paste(font_gradient_im, word_position, font_gradient_im)
 
+def draw_rainbow_text(img, position, text, font, gradient_file):
+    """
+    在图片上绘制彩虹渐变文字。
 
-def circle_corner(img, radii=30, border_width=6):
+    Args:
+        img (PIL.Image.Image): 图片对象。
+        position (tuple): 文字位置，格式为 (x, y)。
+        text (str): 文字内容。
+        font (PIL.ImageFont.FreeTypeFont): 字体对象。
+        gradient_file (str): 渐变颜色效果图片路径。
     """
-    将图片的角变为圆角。
+    font_gradient_im = render_rainbow_text(text, font, str(gradient_file))
+    img.paste(font_gradient_im, position, font_gradient_im)
+
+
+def image_to_bytes(img, image_format="PNG"):
+    """
+    将图片编码为字节，用于直接上传而不写入磁盘。
 
     Args:
         img (PIL.Image.Image): 图片对象。
+        image_format (str): 编码格式。
+
+    Returns:
+        bytes: 编码后的图片数据。
+    """
+    buffer = BytesIO()
+    img.save(buffer, format=image_format)
+    return buffer.getvalue()
+
+
+@lru_cache(maxsize=16)
+def get_corner_mask(size, radii=30):
+    """
+    获取圆角透明度蒙版，按 (尺寸, 圆角半径) 缓存。
+
+    Args:
+        size (tuple): 图片尺寸。
         radii (int): 圆角半径。
-        border_width (int): 边框宽度。
 
     Returns:
-        PIL.Image.Image: 处理后的图片对象。
+        PIL.Image.Image: 共享的 L 模式蒙版，不要在其上绘制。
     """
     # 白色区域透明可见，黑色区域不可见、
     circle = Image.new("L", (radii * 2, radii * 2), 0)
     draw = ImageDraw.Draw(circle)
     draw.ellipse((0, 0, radii * 2, radii * 2), fill=255)
 
-    img = img.convert("RGBA")
-    w, h = img.size
+    w, h = size
 
     # 画角
-    alpha = Image.new("L", img.size, 255)
+    alpha = Image.new("L", size, 255)
     alpha.paste(circle.crop((0, 0, radii, radii)), (0, 0))  # 左上角
     alpha.paste(circle.crop((radii, 0, radii * 2, radii)), (w - radii, 0))  # 右上角
     alpha.paste(
         circle.crop((radii, radii, radii * 2, radii * 2)), (w - radii, h - radii)
     )  # 右下角
     alpha.paste(circle.crop((0, radii, radii, radii * 2)), (0, h - radii))  # 左下角
+    return alpha
 
-    img.putalpha(alpha)
-
-    # Add a black border
-    draw = ImageDraw.Draw(img)
-    draw.rounded_rectangle(
-        img.getbbox(), outline="black", width=border_width, radius=radii
-    )
 
-    return img
-
-
-async def compress_png(fp, output, force=True, quality=None):
+def circle_corner(img, radii=30, border_width=6):
     """
-    Compresses a PNG file asynchronously.
+    将图片的角变为圆角。
 
     Args:
-        fp (str): The file path of the original PNG file.
-        output (str): The file path for the compressed PNG file.
-        force (bool, optional): Whether to force compression. Defaults to True.
-        quality (int or str, optional): Compression quality parameter. Defaults to None.
+        img (PIL.Image.Image): 图片对象。
+        radii (int): 圆角半径。
+        border_width (int): 边框宽度。
 
     Returns:
-        float: Compression ratio percentage.
+        PIL.Image.Image: 处理后的图片对象。
     """
-    if not os.path.exists(fp):
-        raise FileNotFoundError(f"File not found: {fp}")
-
-    force_command = "-f" if force else ""
-    quality_command = ""
-
-    if quality and isinstance(quality, int):
-        quality_command = f"--quality {quality}"
-    if quality and isinstance(quality, str):
-        quality_command = f"--quality {quality}"
+    img = img.convert("RGBA")
+    img.putalpha(get_corner_mask(img.size, radii))
 
-    command = (
-        f"pngquant {fp} "
-        f"--skip-if-larger {force_command} "
-        f"{quality_command} "
-        f"--output {output}"
+    # Add a black border
+    draw = ImageDraw.Draw(img)
+    draw.rounded_rectangle(
+        img.getbbox(), outline="black", width=border_width, radius=radii
     )
 
-    try:
-        process = await asyncio.create_subprocess_shell(
-            command, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
-        )
-        _, _ = await process.communicate()
-
-        # 获取原始图像大小
-        original_size = os.path.getsize(fp)
-
-        # 获取压缩后文件的大小
-        compressed_size = os.path.getsize(output)
-
-        # 计算压缩比
-        compression_ratio = (1 - compressed_size / original_size) * 100
-        # 检查命令是否成功执行
-        if process.returncode != 0:
-            raise subprocess.CalledProcessError(process.returncode, command)
-
-        return compression_ratio
-        # 剩下的代码...
-    except asyncio.CancelledError as exc:
-        # 处理异步任务被取消的情况
-        raise exc from None
-    except Exception as e:
-        # 处理其他异常
-        raise RuntimeError(f"An error occurred: {e}") from e
-
-
-async def download_avatar(session, avatar_url):
-    """
-    下载头像图片。
-
-    Args:
-        session (aiohttp.ClientSession): Aiohttp 客户端会话对象。
-        avatar_url (str): 头像图片的 URL。
-
-    Returns:
-        bytes: 下载的头像图片数据。
-    """
-    async with session.get(avatar_url) as response:
-        return await response.read()
+    return img
 
 
-async def process_avatar(avatar_url):
+def round_avatar(img, size=(185, 185), radii=15):
     """
-    处理头像图片。
+    将头像处理为绘图使用的尺寸和圆角。
 
     Args:
-        avatar_url (str): 头像图片的 URL。
+        img (PIL.Image.Image): 头像图片。
+        size (tuple): 目标尺寸。
+        radii (int): 圆角半径。
 
     Returns:
-        PIL.Image.Image: 处理后的头像图片对象。
+        PIL.Image.Image: 处理后的 RGBA 图片。
     """
-    async with aiohttp.ClientSession() as session:
-        avatar_data = await download_avatar(session, avatar_url)
-
-    # Open the avatar image using PIL
-    avatar_image = Image.open(BytesIO(avatar_data))
-
-    return avatar_image
+    img = img.convert("RGBA")
+    if img.size != size:
+        img = img.resize(size)
+    return circle_corner(img, radii=radii)
@@ -0,0 +1,157 @@
+"""
+text_cache.py - 已栅格化文字的 LRU 缓存。
+"""
+
+import threading
+from collections import OrderedDict
+
+from PIL import Image, ImageDraw
+
+from src.utils.font_registry import FontRegistry
+
+
+class TextBitmapCache:
+    """
+    以 (文字, 字体文件, 字号, 描边宽度, 对齐方式) 为键缓存栅格化后的文字，按内存占用淘汰。
+
+    每段文字缓存为描边和填充两张 L 模式蒙版，颜色在粘贴时才指定，
+    因此同一段文字不同颜色也能共用缓存。
+    """
+
+    _instance = None
+
+    @classmethod
+    def get_instance(cls, max_bytes: int = 16 * 1024 * 1024):
+        """
+        获取单例实例
+        """
+        if cls._instance is None:
+            cls._instance = cls(max_bytes)
+        return cls._instance
+
+    def __init__(self, max_bytes: int = 16 * 1024 * 1024) -> None:
+        """
+        初始化
+
+        Args:
+            max_bytes (int): 缓存蒙版占用内存的上限(字节)。
+        """
+        if TextBitmapCache._instance is not None:
+            raise Exception("这是一个单例类，请使用 get_instance() 获取实例")
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._bitmaps = OrderedDict()
+        self._lock = threading.Lock()
+        TextBitmapCache._instance = self
+
+    def draw(
+        self,
+        img,
+        position,
+        text: str,
+        font: str,
+        size: int,
+        fill,
+        stroke_width: int = 0,
+        stroke_fill=(0, 0, 0),
+        align: str = "left",
+    ):
+        """
+        在图片上绘制文字，效果与 ImageDraw.text 相同(左上角锚点)。
+
+        Args:
+            img (PIL.Image.Image): 图片对象。
+            position (tuple): 文字位置，格式为 (x, y)。
+            text (str): 文字内容，可以包含换行。
+            font (str): 字体文件名。
+            size (int): 字号。
+            fill (tuple): 文字颜色。
+            stroke_width (int): 描边宽度。
+            stroke_fill (tuple): 描边颜色。
+            align (str): 多行文字的对齐方式。
+        """
+        if not text:
+            return
+        (left, top), stroke_mask, fill_mask = self.get(
+            text, font, size, stroke_width, align
+        )
+        box = (int(position[0]) + left, int(position[1]) + top)
+        if stroke_mask is not None:
+            img.paste(stroke_fill, box, stroke_mask)
+        img.paste(fill, box, fill_mask)
+
+    def get(self, text: str, font: str, size: int, stroke_width: int = 0, align="left"):
+        """
+        获取栅格化后的文字
+
+        Returns:
+            tuple: (偏移, 描边蒙版或 None, 填充蒙版)。
+        """
+        key = (text, font, size, stroke_width, align)
+        with self._lock:
+            bitmap = self._bitmaps.get(key)
+            if bitmap is not None:
+                self._bitmaps.move_to_end(key)
+                self.hits += 1
+                return bitmap
+        bitmap = self._rasterize(text, font, size, stroke_width, align)
+        with self._lock:
+            self.misses += 1
+            if key not in self._bitmaps:
+                self._bitmaps[key] = bitmap
+                self.current_bytes += self._cost(bitmap)
+                self._evict()
+        return bitmap
+
+    @staticmethod
+    def _rasterize(text, font, size, stroke_width, align):
+        font_obj = FontRegistry.get_instance().get(font, size)
+        measure = ImageDraw.Draw(Image.new("L", (1, 1)))
+        left, top, right, bottom = measure.textbbox(
+            (0, 0), text, font=font_obj, stroke_width=stroke_width, align=align
+        )
+        mask_size = (max(right - left, 1), max(bottom - top, 1))
+
+        stroke_mask = None
+        if stroke_width:
+            stroke_mask = Image.new("L", mask_size, 0)
+            ImageDraw.Draw(stroke_mask).text(
+                (-left, -top),
+                text,
+                font=font_obj,
+                fill=255,
+                stroke_width=stroke_width,
+                stroke_fill=255,
+                align=align,
+            )
+        fill_mask = Image.new("L", mask_size, 0)
+        ImageDraw.Draw(fill_mask).text(
+            (-left, -top), text, font=font_obj, fill=255, align=align
+        )
+        return (left, top), stroke_mask, fill_mask
+
+    @staticmethod
+    def _cost(bitmap) -> int:
+        _, stroke_mask, fill_mask = bitmap
+        cost = fill_mask.width * fill_mask.height
+        if stroke_mask is not None:
+            cost += stroke_mask.width * stroke_mask.height
+        return cost
+
+    def _evict(self):
+        while self.current_bytes > self.max_bytes and len(self._bitmaps) > 1:
+            _, bitmap = self._bitmaps.popitem(last=False)
+            self.current_bytes -= self._cost(bitmap)
+
+    def stats(self) -> dict:
+        """
+        缓存统计信息
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "items": len(self._bitmaps),
+            "bytes": self.current_bytes,
+        }
@@ -0,0 +1,28 @@
+"""
+pytest 配置：在临时目录中生成配置文件并切换工作目录，
+导入 app_config 时不会读写仓库中的 config.yaml 和 log 目录。
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import yaml
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+WORKDIR = tempfile.mkdtemp(prefix="maimai-bot-test-")
+
+with open(ROOT / "config_example.yaml", "r", encoding="utf-8") as file:
+    test_config = yaml.safe_load(file)
+test_config["iam_ak"] = ""
+test_config["iam_sk"] = ""
+test_config["static_config"]["assets_path"] = os.path.join(WORKDIR, "mai")
+test_config["static_config"]["font_path"] = os.path.join(WORKDIR, "fonts")
+test_config["cache_config"]["cache_path"] = os.path.join(WORKDIR, "cache")
+with open(os.path.join(WORKDIR, "config.yaml"), "w", encoding="utf-8") as file:
+    yaml.dump(test_config, file)
+
+os.chdir(WORKDIR)
@@ -0,0 +1,52 @@
+"""
+BoardStateStore 保存、读取与磁盘预算的测试。
+"""
+
+import os
+
+import pytest
+from PIL import Image
+
+from src.draw.board_state import BoardStateStore
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(BoardStateStore, "_instance", None)
+    return BoardStateStore(tmp_path, max_bytes=2500)
+
+
+def test_saved_board_loads_identical(store):
+    img = Image.new("RGBA", (20, 10), (10, 20, 30, 255))
+    img.putpixel((3, 4), (255, 0, 0, 128))
+
+    store.save("user", img, {"version": 1})
+    loaded, state = store.load("user")
+
+    assert loaded.tobytes() == img.tobytes()
+    assert loaded.mode == img.mode and loaded.size == img.size
+    assert state["version"] == 1
+
+
+def test_mismatched_files_are_not_loaded(store, tmp_path):
+    store.save("user", Image.new("L", (10, 10), 0), {"version": 1})
+    (tmp_path / "user.raw").write_bytes(b"\1" * 100)
+
+    assert store.load("user") == (None, None)
+
+
+def test_least_recently_used_boards_are_removed(store, tmp_path):
+    # 每张画板约 1000 字节像素加上 JSON，预算只能放下两张
+    img = Image.new("L", (40, 25), 0)
+    for i, board_key in enumerate(["a", "b", "c", "d"]):
+        store.save(board_key, img, {"version": 1})
+        # 保证修改时间有先后
+        os.utime(tmp_path / f"{board_key}.raw", (i, i))
+    # a 最近被读取过
+    os.utime(tmp_path / "a.raw", (10, 10))
+
+    store.prune()
+
+    names = sorted(path.name for path in tmp_path.iterdir())
+    assert names == ["a.json", "a.raw", "d.json", "d.raw"]
+    assert store.evictions == 2
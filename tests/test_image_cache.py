@@ -0,0 +1,58 @@
+"""
+ImageCache 按内存占用淘汰的测试。
+"""
+
+from PIL import Image
+
+from src.utils.image_cache import ImageCache
+
+
+def make_images(tmp_path, count, size=(10, 10)):
+    paths = []
+    for i in range(count):
+        path = tmp_path / f"{i}.png"
+        Image.new("RGB", size, (i, i, i)).save(path)
+        paths.append(path)
+    return paths
+
+
+def test_image_cache_evicts_least_recently_used(tmp_path, monkeypatch):
+    monkeypatch.setattr(ImageCache, "_instance", None)
+    # 10x10 RGB = 300 字节，只能放下两张
+    cache = ImageCache(max_bytes=700)
+    first, second, third = make_images(tmp_path, 3)
+
+    cache.open(first)
+    cache.open(second)
+    cache.open(first)
+    cache.open(third)
+
+    assert cache.current_bytes <= cache.max_bytes
+    assert cache.stats()["items"] == 2
+    cache.open(first)
+    assert cache.stats()["hits"] == 2
+    cache.open(second)
+    assert cache.stats()["misses"] == 4
+
+
+def test_image_cache_keeps_image_larger_than_budget(tmp_path, monkeypatch):
+    monkeypatch.setattr(ImageCache, "_instance", None)
+    cache = ImageCache(max_bytes=100)
+    (path,) = make_images(tmp_path, 1)
+
+    cache.open(path)
+    cache.open(path)
+
+    assert cache.stats()["items"] == 1
+    assert cache.stats()["hits"] == 1
+
+
+def test_image_cache_copy_is_not_shared(tmp_path, monkeypatch):
+    monkeypatch.setattr(ImageCache, "_instance", None)
+    cache = ImageCache(max_bytes=1024)
+    (path,) = make_images(tmp_path, 1)
+
+    img = cache.open(path, copy=True)
+    img.putpixel((0, 0), (255, 255, 255))
+
+    assert cache.open(path).getpixel((0, 0)) == (0, 0, 0)
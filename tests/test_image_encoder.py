@@ -0,0 +1,53 @@
+"""
+ImageEncoder 体积预算的测试。
+"""
+
+import random
+from io import BytesIO
+
+import pytest
+from PIL import Image
+
+from src.utils.app_config import config
+from src.utils.image_encoder import ImageEncoder, get_output_encoder
+
+
+@pytest.fixture(scope="module")
+def noisy_image():
+    # 随机噪点几乎无法压缩，编码器必须降低质量或缩小尺寸才能满足预算
+    rng = random.Random(0)
+    img = Image.frombytes("RGB", (400, 400), rng.randbytes(400 * 400 * 3))
+    return img.resize((800, 800))
+
+
+@pytest.mark.parametrize(
+    "backend, max_kb", [("webp", 64), ("jpeg", 64), ("png_quant", 200)]
+)
+def test_encoder_stays_under_budget(noisy_image, backend, max_kb):
+    unbounded = ImageEncoder(backend, 80).encode(noisy_image)
+    encoded = ImageEncoder(backend, 80, max_kb * 1024).encode(noisy_image)
+
+    assert len(unbounded.data) > max_kb * 1024
+    assert len(encoded.data) <= max_kb * 1024
+
+
+def test_output_encoder_uses_output_max_kb(noisy_image, monkeypatch):
+    monkeypatch.setattr(
+        config,
+        "render_config",
+        {"output_format": "webp", "output_quality": 90, "output_max_kb": 64},
+    )
+
+    encoder = get_output_encoder()
+    encoded = encoder.encode(noisy_image)
+
+    assert encoder.max_bytes == 64 * 1024
+    assert len(encoded.data) <= 64 * 1024
+    assert get_output_encoder(is_use_origin=True).max_bytes == 0
+
+
+def test_encoder_keeps_size_within_budget(noisy_image):
+    encoded = ImageEncoder("webp", 80, 16 * 1024 * 1024).encode(noisy_image)
+
+    assert encoded.quality == 80
+    assert Image.open(BytesIO(encoded.data)).size == (800, 800)
@@ -0,0 +1,102 @@
+"""
+render_incremental 与完整绘制结果一致的测试。
+"""
+
+import json
+
+import pytest
+from PIL import Image, ImageDraw
+
+from src.draw import maimai_drawing_board
+from src.draw.maimai_drawing_board import LayoutElement, MaimaiDrawingBoard
+
+BOARD_SIZE = (400, 300)
+
+
+@pytest.fixture
+def background(tmp_path, monkeypatch):
+    img = Image.new("RGBA", BOARD_SIZE, (30, 60, 90, 255))
+    ImageDraw.Draw(img).ellipse((50, 20, 350, 280), fill=(200, 180, 40, 255))
+    path = tmp_path / "background.png"
+    img.save(path)
+    # 静态层的素材不在测试环境中，直接使用背景图
+    monkeypatch.setattr(
+        maimai_drawing_board,
+        "get_static_layer",
+        lambda main_img_path, footer_img_name: img,
+    )
+    return path
+
+
+def make_board(background, contents):
+    """
+    Build a board whose layout has one element per (name, rect, color),
+    drawn as a translucent rectangle so that overlaps depend on the z-order.
+    """
+    board = MaimaiDrawingBoard(background, player=None, seed="test")
+    board.choices = {"footer": maimai_drawing_board.FOOTER_IMG_LIST[0]}
+
+    def draw(rect, color):
+        overlay = Image.new("RGBA", (rect[2] - rect[0], rect[3] - rect[1]), color)
+        board.main_img.alpha_composite(overlay, rect[:2])
+
+    board._layout = [
+        LayoutElement(
+            name,
+            repr((rect, color)),
+            rect,
+            lambda r=rect, c=color: draw(r, c),
+        )
+        for name, rect, color in contents
+    ]
+    return board
+
+
+PREVIOUS = [
+    ("a", (10, 10, 110, 110), (255, 0, 0, 160)),
+    ("b", (80, 80, 180, 180), (0, 255, 0, 160)),
+    ("c", (150, 150, 250, 250), (0, 0, 255, 160)),
+    ("d", (300, 10, 390, 60), (255, 255, 255, 200)),
+]
+
+
+@pytest.mark.parametrize(
+    "current, expected_redrawn",
+    [
+        # b 变化，与 b 重叠的 a、c 也要重绘，d 不变
+        (
+            [PREVIOUS[0], ("b", (80, 80, 180, 180), (255, 0, 255, 100)), *PREVIOUS[2:]],
+            ["a", "b", "c"],
+        ),
+        # d 移动位置
+        ([*PREVIOUS[:3], ("d", (300, 200, 390, 250), (255, 255, 255, 200))], ["d"]),
+        # c 被移除，重绘与其重叠的 b，进而重绘与 b 重叠的 a
+        ([*PREVIOUS[:2], PREVIOUS[3]], ["a", "b"]),
+        # 没有变化
+        (PREVIOUS, []),
+    ],
+)
+def test_incremental_matches_full_render(background, current, expected_redrawn):
+    previous_board = make_board(background, PREVIOUS)
+    previous_img = previous_board.render().copy()
+    # 状态保存时经过 JSON，元组会变成列表
+    previous_state = json.loads(json.dumps(previous_board.get_layout_state()))
+
+    incremental_board = make_board(background, current)
+    incremental = incremental_board.render_incremental(previous_img, previous_state)
+    full = make_board(background, current).render()
+
+    assert incremental_board.redrawn == expected_redrawn
+    assert incremental.tobytes() == full.tobytes()
+
+
+def test_incremental_falls_back_on_other_layout_version(background):
+    previous_board = make_board(background, PREVIOUS)
+    previous_img = previous_board.render().copy()
+    previous_state = dict(previous_board.get_layout_state(), version=-1)
+
+    board = make_board(background, PREVIOUS)
+    img = board.render_incremental(previous_img, previous_state)
+
+    assert board.redrawn == [name for name, _, _ in PREVIOUS]
+    assert img.tobytes() == make_board(background, PREVIOUS).render().tobytes()
@@ -0,0 +1,88 @@
+"""
+RenderScheduler 合并任务和队列已满的测试。
+"""
+
+import asyncio
+
+import pytest
+
+from src.draw.render_scheduler import RenderScheduler, SchedulerFullError
+
+
+@pytest.fixture
+def scheduler(monkeypatch):
+    monkeypatch.setattr(RenderScheduler, "_instance", None)
+    return RenderScheduler(max_concurrency=1, max_queue=1)
+
+
+def test_same_key_is_coalesced(scheduler):
+    calls = []
+
+    async def main():
+        release = asyncio.Event()
+
+        async def job():
+            calls.append(1)
+            await release.wait()
+            return "board"
+
+        first = asyncio.ensure_future(scheduler.submit("user", job))
+        second = asyncio.ensure_future(scheduler.submit("user", job))
+        await asyncio.sleep(0)
+        release.set()
+        return await asyncio.gather(first, second)
+
+    assert asyncio.run(main()) == ["board", "board"]
+    assert len(calls) == 1
+    stats = scheduler.stats()
+    assert stats["submitted"] == 1
+    assert stats["coalesced"] == 1
+    assert stats["completed"] == 1
+    assert stats["running"] == 0
+
+
+def test_full_queue_is_rejected(scheduler):
+    positions = []
+
+    async def main():
+        release = asyncio.Event()
+
+        async def job():
+            await release.wait()
+            return "board"
+
+        async def on_queued(position):
+            positions.append(position)
+
+        running = asyncio.ensure_future(scheduler.submit("a", job))
+        await asyncio.sleep(0)
+        queued = asyncio.ensure_future(scheduler.submit("b", job, on_queued))
+        await asyncio.sleep(0)
+        with pytest.raises(SchedulerFullError):
+            await scheduler.submit("c", job)
+        release.set()
+        return await asyncio.gather(running, queued)
+
+    assert asyncio.run(main()) == ["board", "board"]
+    assert positions == [1]
+    stats = scheduler.stats()
+    assert stats["rejected"] == 1
+    assert stats["completed"] == 2
+    assert stats["queue_depth"] == 0
+
+
+def test_failed_job_is_not_coalesced_afterwards(scheduler):
+    async def failing():
+        raise ValueError("render failed")
+
+    async def working():
+        return "board"
+
+    async def main():
+        with pytest.raises(ValueError):
+            await scheduler.submit("user", failing)
+        return await scheduler.submit("user", working)
+
+    assert asyncio.run(main()) == "board"
+    assert scheduler.stats()["failed"] == 1
+    assert scheduler.stats()["coalesced"] == 0
@@ -0,0 +1,59 @@
+"""
+TextBitmapCache 按内存占用淘汰的测试。
+"""
+
+from PIL import Image, ImageFont
+
+from src.utils.font_registry import FontRegistry
+from src.utils.text_cache import TextBitmapCache
+
+TEST_FONT = "test.ttf"
+TEST_FONT_SIZE = 24
+
+
+def use_default_font(monkeypatch):
+    # 测试环境没有字体文件，使用 Pillow 自带的字体
+    registry = FontRegistry.get_instance()
+    monkeypatch.setitem(
+        registry._fonts,
+        (TEST_FONT, TEST_FONT_SIZE),
+        ImageFont.load_default(TEST_FONT_SIZE),
+    )
+
+
+def test_text_cache_evicts_under_byte_bound(monkeypatch):
+    use_default_font(monkeypatch)
+    monkeypatch.setattr(TextBitmapCache, "_instance", None)
+    texts = ["maimai", "DX rating", "16500"]
+    costs = [
+        TextBitmapCache._cost(
+            TextBitmapCache._rasterize(text, TEST_FONT, TEST_FONT_SIZE, 2, "left")
+        )
+        for text in texts
+    ]
+    # 只能放下后两段文字
+    cache = TextBitmapCache(max_bytes=costs[1] + costs[2])
+
+    for text in texts:
+        cache.get(text, TEST_FONT, TEST_FONT_SIZE, 2)
+
+    assert cache.current_bytes == costs[1] + costs[2]
+    assert cache.stats()["items"] == 2
+    cache.get(texts[2], TEST_FONT, TEST_FONT_SIZE, 2)
+    assert cache.stats()["hits"] == 1
+    cache.get(texts[0], TEST_FONT, TEST_FONT_SIZE, 2)
+    assert cache.stats()["misses"] == 4
+    assert cache.current_bytes <= cache.max_bytes
+
+
+def test_text_cache_shares_bitmap_across_colors(monkeypatch):
+    use_default_font(monkeypatch)
+    monkeypatch.setattr(TextBitmapCache, "_instance", None)
+    cache = TextBitmapCache(max_bytes=1024 * 1024)
+    img = Image.new("RGBA", (200, 60))
+
+    cache.draw(img, (5, 5), "123", TEST_FONT, TEST_FONT_SIZE, (255, 0, 0), 2)
+    cache.draw(img, (5, 5), "123", TEST_FONT, TEST_FONT_SIZE, (0, 0, 255), 2)
+
+    assert cache.stats()["misses"] == 1
+    assert cache.stats()["hits"] == 1